@@ -9,7 +9,7 @@ class DominusAgent(Agent):
         text = convo.content.lower()
 
         if "ligar computador" in text:
-            return Action(
+            return Action.fast(
                 type=ActionType.LOG,
                 target="system",
                 payload={"text": "Comando para ligar computador recebido"},
@@ -9,7 +9,7 @@ class LuciaAgent(Agent):
         text = convo.content.lower()
 
         if not session:
-            return Action(
+            return Action.fast(
                 type=ActionType.SEND_MESSAGE,
                 target=convo.stream,
                 payload={"text": "Olá! Como posso ajudar:"},
@@ -18,7 +18,7 @@ class LuciaAgent(Agent):
 
         if "bolo" in text:
             session.context["topic"] = "bolo"
-            return Action(
+            return Action.fast(
                 type=ActionType.SEND_MESSAGE,
                 target=convo.stream,
                 payload={"text": "Que delícia 😄 Qual tipo de bolo você prefere?"},
@@ -26,7 +26,7 @@ class LuciaAgent(Agent):
             )
 
         if session.context.get("topic") == "bolo":
-            return Action(
+            return Action.fast(
                 type=ActionType.SEND_MESSAGE,
                 target=convo.stream,
                 payload={
@@ -39,7 +39,7 @@ class LuciaAgent(Agent):
 
     def handle(self, action: Action) -> Action:
         if action.type == ActionType.SEND_MESSAGE:
-            return Action(
+            return Action.fast(
                 type=ActionType.SEND_MESSAGE,
                 target=action.target,
                 payload={"text": f"Lúcia diz: {action.payload.get('text')}"},
@@ -0,0 +1,142 @@
+"""
+Bytes por sessão viva e por item de memória retido, com N usuários.
+
+    python benchmarks/memory_footprint.py [--users 100000]
+
+Compara os registros atuais (com __slots__) com equivalentes que têm
+`__dict__` por instância, como eram antes. As sessões são medidas depois
+de uma consulta roteada, que lê o `session_id` (e portanto o cria).
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from cortex.contracts import ConversationEvent
+from cortex.state import InMemorySessionBackend, Session, SessionManager
+from memory.store import MemoryItem
+from oracle.models import ActionResult, OracleRecord
+
+
+class DictSession:
+    def __init__(self, session_id, user_id, stream, agent):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.stream = stream
+        self.agent = agent
+        self.state = "IN_CONVERSATION"
+        self.last_activity = time.time()
+        self.context = {}
+
+
+class DictMemoryItem:
+    def __init__(self, content, timestamp):
+        self.content = content
+        self.timestamp = timestamp
+
+
+class DictConversationEvent:
+    def __init__(self, stream, user_id, content):
+        self.event_id = str(uuid.uuid4())
+        self.timestamp = time.time()
+        self.stream = stream
+        self.user_id = user_id
+        self.session_id = None
+        self.agent_hint = None
+        self.modality = "text"
+        self.content = content
+        self.metadata = {}
+
+
+def measure(build, n: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build(n)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return total / n
+
+
+def sessions(n: int):
+    manager = SessionManager(backend=InMemorySessionBackend())
+    for i in range(n):
+        session = manager.start_session(f"user{i}", "terminal", "lucia")
+        # o DecisionEngine.resolve copia o session_id para o evento roteado
+        session.session_id
+    return manager
+
+
+def dict_sessions(n: int):
+    # mesmo contêiner do InMemorySessionBackend, só muda o registro
+    return OrderedDict(
+        (
+            f"terminal:user{i}",
+            DictSession(str(uuid.uuid4()), f"user{i}", "terminal", "lucia"),
+        )
+        for i in range(n)
+    )
+
+
+def memory_items(n: int):
+    return [MemoryItem("oi", time.time()) for _ in range(n)]
+
+
+def dict_memory_items(n: int):
+    return [DictMemoryItem("oi", datetime.now()) for _ in range(n)]
+
+
+def events(n: int):
+    return [
+        ConversationEvent(stream="terminal", user_id="a", content="oi")
+        for _ in range(n)
+    ]
+
+
+def dict_events(n: int):
+    return [DictConversationEvent("terminal", "a", "oi") for _ in range(n)]
+
+
+def records(n: int):
+    now = datetime.now()
+    return [
+        OracleRecord(
+            now, "text", "a", "send_message", "terminal", 0.5, 1, ActionResult.SUCCESS
+        )
+        for _ in range(n)
+    ]
+
+
+CASES = [
+    ("session", sessions, dict_sessions),
+    ("memory item", memory_items, dict_memory_items),
+    ("conversation event", events, dict_events),
+    ("oracle record", records, None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+
+    assert not hasattr(Session(None, "u", "t", "a"), "__dict__")
+
+    print(f"{'registro':<20} {'bytes/obj':>10} {'antes':>10}")
+    for name, build, legacy in CASES:
+        current = measure(build, args.users)
+        before = f"{measure(legacy, args.users):10.0f}" if legacy else f"{'-':>10}"
+        print(f"{name:<20} {current:10.0f} {before}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Tempo de `analyze()` por modo sobre um histórico sintético.
+
+    python benchmarks/oracle_analyze.py [--rows 1000000] [--modes sql columnar]
+
+O modo columnar precisa do NumPy (`pip install nexus[analysis]`).
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from oracle.models import ActionResult, OracleRecord
+from oracle.service import ANALYZER_MODES, OracleService
+from oracle.storage import OracleStorage
+
+
+def populate(storage: OracleStorage, rows: int, seed: int = 1):
+    rng = random.Random(seed)
+    now = datetime.now()
+    results = list(ActionResult)
+    batch = []
+
+    for i in range(rows):
+        batch.append(
+            OracleRecord(
+                ts=now - timedelta(seconds=rng.randint(0, 30 * 86400)),
+                event_type="text",
+                source=f"user{rng.randint(0, 999)}",
+                action_type=rng.choice(["send_message", "log", "speak"]),
+                target=rng.choice(["terminal", "http", "system"]),
+                confidence=rng.random(),
+                priority=1,
+                result=rng.choice(results),
+            )
+        )
+        if len(batch) == 50_000:
+            storage.save_many(batch)
+            batch.clear()
+
+    storage.save_many(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--modes", nargs="+", default=["sql", "columnar"])
+    args = parser.parse_args()
+
+    unknown = set(args.modes) - set(ANALYZER_MODES)
+    if unknown:
+        parser.error(f"modos desconhecidos: {sorted(unknown)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = OracleStorage(Path(tmp) / "oracle.db")
+        populate(storage, args.rows)
+
+        for mode in args.modes:
+            service = OracleService(storage=storage, analyzer_mode=mode)
+            start = time.perf_counter()
+            insights = service.analyze()
+            elapsed = time.perf_counter() - start
+            print(f"{mode:<12} {elapsed:8.2f}s  {len(insights)} insights")
+
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
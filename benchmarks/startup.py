@@ -0,0 +1,136 @@
+"""
+Tempo de import dos entry points, medido com `python -X importtime`.
+
+    python benchmarks/startup.py [--repeat 5] [--entry main http terminal]
+
+Cada import roda em um processo novo, em um diretório vazio: além do tempo
+total e do tempo gasto nos módulos do projeto, mostra se o import escreveu
+algo na saída ou criou arquivos (ex.: `oracle.db`).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = {
+    "main": "main",
+    "http": "stream.http.app",
+    "terminal": "stream.terminal.server",
+}
+
+# pacotes do projeto; o resto (pydantic, fastapi, stdlib) é dependência
+PROJECT_PACKAGES = {
+    "agents",
+    "cortex",
+    "echo",
+    "guard",
+    "main",
+    "memory",
+    "oracle",
+    "runtime",
+    "stream",
+    "telemetry",
+}
+
+# orçamento do código do próprio projeto no import de cada entry point
+OWN_BUDGET_MS = 100.0
+
+
+class Startup(NamedTuple):
+    total_ms: float  # import completo, dependências incluídas
+    own_ms: float  # só o tempo próprio dos módulos do projeto
+    slowest: List[tuple]  # (ms próprios, módulo) do projeto, maiores primeiro
+    output: str  # o que o import escreveu no stdout
+    created: List[str]  # arquivos criados no diretório de trabalho
+
+
+def parse_importtime(stderr: str) -> tuple:
+    total_us, own = 0, []
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        module = name.strip()
+
+        # linhas sem indentação são os imports de primeiro nível
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative_us)
+        if module.split(".")[0] in PROJECT_PACKAGES:
+            own.append((int(self_us) / 1000, module))
+
+    own.sort(reverse=True)
+    return total_us / 1000, own
+
+
+def measure(module: str) -> Startup:
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        done = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=tmp,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        created = sorted(os.listdir(tmp))
+
+    total_ms, own = parse_importtime(done.stderr)
+    return Startup(
+        total_ms=total_ms,
+        own_ms=sum(ms for ms, _ in own),
+        slowest=own[:5],
+        output=done.stdout,
+        created=created,
+    )
+
+
+def best_of(module: str, repeat: int) -> Startup:
+    # o menor tempo é o menos afetado por ruído do sistema
+    return min((measure(module) for _ in range(repeat)), key=lambda s: s.total_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--entry", nargs="+", default=list(ENTRY_POINTS))
+    args = parser.parse_args()
+
+    unknown = set(args.entry) - set(ENTRY_POINTS)
+    if unknown:
+        parser.error(f"entry points desconhecidos: {sorted(unknown)}")
+
+    failed = False
+    results: Dict[str, Startup] = {}
+
+    for entry in args.entry:
+        result = results[entry] = best_of(ENTRY_POINTS[entry], args.repeat)
+        ok = result.own_ms <= OWN_BUDGET_MS and not result.output and not result.created
+        failed |= not ok
+
+        print(
+            f"{entry:>9}: total {result.total_ms:7.1f} ms  "
+            f"projeto {result.own_ms:6.1f} ms  "
+            f"{'ok' if ok else 'ESTOUROU'}"
+        )
+        for ms, module in result.slowest:
+            print(f"{'':>11}{ms:6.1f} ms  {module}")
+        if result.output:
+            print(f"{'':>11}escreveu {len(result.output)} caracteres no stdout")
+        if result.created:
+            print(f"{'':>11}criou {', '.join(result.created)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
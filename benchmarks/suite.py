@@ -0,0 +1,383 @@
+"""
+Carga reproduzível sobre o pipeline do Nexus, com baselines versionadas.
+
+    python benchmarks/suite.py [--size small|medium|large] [--scenarios ...]
+                               [--update] [--threshold 0.25]
+
+Cenários: `runtime` (NexusRuntime.handle_input), `core` (handle_event),
+`http` (POST /event por um cliente ASGI em processo), `terminal` (clientes
+no servidor asyncio) e `analyzer` (OracleAnalyzer.analyze sobre um
+histórico sintético). Os tamanhos são 1k, 100k e 10M eventos/registros;
+o `large` roda só o `analyzer` por padrão (10M eventos pelos pipelines
+levariam horas), mas aceita os outros cenários com `--scenarios`.
+
+O cooldown global do Guard fica desligado durante a carga: com ele, quase
+todos os eventos sairiam no Guard, antes de echo, Oracle e memória.
+
+Cada cenário roda em um processo novo e em um diretório temporário, então
+o pico de RSS é só dele e nada toca o oracle.db do repositório. O
+resultado é comparado com `baselines.json`; a saída é 1 quando algum
+cenário piora mais que `--threshold` (vazão menor, p99 ou RSS maiores).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+from telemetry.metrics import LatencyHistogram
+
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+
+SIZES = {
+    "small": 1_000,
+    "medium": 100_000,
+    "large": 10_000_000,
+}
+
+# cenários padrão por tamanho (os demais tamanhos rodam todos)
+SIZE_SCENARIOS = {"large": ["analyzer"]}
+
+DEFAULT_THRESHOLD = 0.25
+
+# frases do corpus: conversa, comida (FoodPolicy), comandos e o Dominus
+PHRASES = (
+    "oi lucia",
+    "quero bolo de cenoura",
+    "tem receita de torta?",
+    "dominus ligar a luz da sala",
+    "como está o tempo hoje",
+    "boa noite",
+    "lucia me conta uma história",
+    "dominus desligar o ar",
+)
+USERS = 1_000
+
+
+def corpus(n: int, seed: int = 7) -> Iterator[Tuple[str, str]]:
+    """(texto, user_id) determinísticos para `n` eventos."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield rng.choice(PHRASES), f"user{rng.randrange(USERS)}"
+
+
+# ========================
+#   CENÁRIOS
+# ========================
+
+
+def _oracle(workdir: Path):
+    from oracle.service import OracleService
+    from oracle.storage import OracleStorage
+
+    # como o do container: gravação em lotes pela thread do write-behind
+    return OracleService(OracleStorage(workdir / "oracle.db", write_behind=True))
+
+
+def _timed(calls: Iterator[Callable[[], Any]]) -> Tuple[int, float, LatencyHistogram]:
+    latencies = LatencyHistogram()
+    count = 0
+
+    start = time.perf_counter()
+    for call in calls:
+        began = time.perf_counter_ns()
+        call()
+        latencies.record(time.perf_counter_ns() - began)
+        count += 1
+
+    return count, time.perf_counter() - start, latencies
+
+
+def run_runtime(n: int, workdir: Path):
+    from agents.dominus import DominusAgent
+    from agents.lucia import LuciaAgent
+    from runtime.container import Container
+    from runtime.context import NexusContext
+    from runtime.runtime import NexusRuntime
+
+    services = Container()
+    services.oracle = _oracle(workdir)
+
+    ctx = NexusContext(services)
+    ctx.register_agent("lucia", LuciaAgent())
+    ctx.register_agent("dominus", DominusAgent())
+    runtime = NexusRuntime(ctx)
+
+    result = _timed(
+        lambda text=text, user=user: runtime.handle_input(
+            text=text, user_id=user, stream="terminal"
+        )
+        for text, user in corpus(n)
+    )
+    services.oracle.storage.flush()
+    return result
+
+
+def run_core(n: int, workdir: Path):
+    from cortex.contracts import Event, EventType
+    from cortex.core import handle_event
+    from runtime.container import container
+
+    services = container()
+    services.oracle = _oracle(workdir)
+
+    events = (
+        Event(
+            type=EventType.TEXT,
+            source="terminal",
+            payload={"text": text, "user_id": user},
+        )
+        for text, user in corpus(n)
+    )
+    result = _timed(lambda event=event: handle_event(event) for event in events)
+    services.oracle.storage.flush()
+    return result
+
+
+def run_http(n: int, workdir: Path):
+    import httpx
+
+    from runtime.container import container
+    from stream.http.app import create_app
+
+    services = container()
+    services.oracle = _oracle(workdir)
+    app = create_app()
+
+    async def drive():
+        latencies = LatencyHistogram()
+        transport = httpx.ASGITransport(app=app)
+
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://nexus"
+        ) as client:
+            start = time.perf_counter()
+            for text, user in corpus(n):
+                began = time.perf_counter_ns()
+                response = await client.post(
+                    "/event",
+                    json={
+                        "type": "text",
+                        "source": "http",
+                        "payload": {"text": text, "user_id": user},
+                    },
+                )
+                response.raise_for_status()
+                latencies.record(time.perf_counter_ns() - began)
+
+            # as tarefas e a fila do Oracle fazem parte do custo
+            await services.background.drain()
+            services.oracle.storage.flush()
+            elapsed = time.perf_counter() - start
+
+        return n, elapsed, latencies
+
+    return asyncio.run(drive())
+
+
+def run_terminal(n: int, workdir: Path, clients: int = 10):
+    from stream.terminal.server import TerminalStreamServer
+
+    async def client(port: int, lines: List[str], latencies: LatencyHistogram):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for line in lines:
+            began = time.perf_counter_ns()
+            writer.write(line.encode() + b"\n")
+            await writer.drain()
+            await reader.readline()
+            latencies.record(time.perf_counter_ns() - began)
+        writer.close()
+        await writer.wait_closed()
+
+    async def drive():
+        terminal = TerminalStreamServer(port=0, max_connections=clients)
+        server = await terminal.start()
+        port = server.sockets[0].getsockname()[1]
+
+        texts = [text for text, _ in corpus(n)]
+        latencies = LatencyHistogram()
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(client(port, texts[i::clients], latencies) for i in range(clients))
+        )
+        elapsed = time.perf_counter() - start
+
+        server.close()
+        await server.wait_closed()
+        terminal.sessions.stop_reaper()
+        return n, elapsed, latencies
+
+    return asyncio.run(drive())
+
+
+def run_analyzer(n: int, workdir: Path, repeat: int = 3):
+    from benchmarks.oracle_analyze import populate
+    from oracle.service import OracleService
+    from oracle.storage import OracleStorage
+
+    storage = OracleStorage(workdir / "oracle.db")
+    populate(storage, n)
+
+    service = OracleService(storage=storage)
+    count, elapsed, latencies = _timed(service.analyze for _ in range(repeat))
+    storage.close()
+
+    # vazão em registros analisados por segundo
+    return count * n, elapsed, latencies
+
+
+SCENARIOS: Dict[str, Callable[[int, Path], Tuple[int, float, LatencyHistogram]]] = {
+    "runtime": run_runtime,
+    "core": run_core,
+    "http": run_http,
+    "terminal": run_terminal,
+    "analyzer": run_analyzer,
+}
+
+
+# ========================
+#   EXECUÇÃO E COMPARAÇÃO
+# ========================
+
+
+@contextmanager
+def without_cooldown() -> Iterator[None]:
+    # cada evento deve percorrer o pipeline inteiro, não esbarrar nos 5 s
+    # entre ações do Guard
+    from guard.guard import Guard
+
+    cooldown = Guard.COOLDOWN_SECONDS
+    Guard.COOLDOWN_SECONDS = 0
+    try:
+        yield
+    finally:
+        Guard.COOLDOWN_SECONDS = cooldown
+
+
+def measure(scenario: str, n: int, workdir: Path) -> Dict[str, float]:
+    with without_cooldown():
+        count, elapsed, latencies = SCENARIOS[scenario](n, workdir)
+
+    return {
+        "events_per_sec": round(count / elapsed, 1),
+        "p50_ms": round(latencies.quantile(0.50) * 1000, 3),
+        "p99_ms": round(latencies.quantile(0.99) * 1000, 3),
+        # ru_maxrss vem em KiB no Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def run_isolated(scenario: str, n: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        done = subprocess.run(
+            [sys.executable, __file__, "--worker", scenario, str(n)],
+            cwd=tmp,
+            env=dict(os.environ, PYTHONPATH=str(ROOT)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(done.stdout.splitlines()[-1])
+
+
+def compare(
+    result: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """Regressões de `result` em relação a `baseline` além de `threshold`."""
+    regressions = []
+
+    floor = baseline["events_per_sec"] * (1 - threshold)
+    if result["events_per_sec"] < floor:
+        regressions.append(f"vazão {result['events_per_sec']:.0f}/s < {floor:.0f}/s")
+
+    for metric in ("p99_ms", "peak_rss_mb"):
+        ceiling = baseline[metric] * (1 + threshold)
+        if result[metric] > ceiling:
+            regressions.append(f"{metric} {result[metric]} > {ceiling:.3f}")
+
+    return regressions
+
+
+def load_baselines() -> Dict[str, Any]:
+    if not BASELINES.exists():
+        return {"machine": {}, "results": {}}
+    return json.loads(BASELINES.read_text())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--scenarios", nargs="+")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update", action="store_true", help="grava as baselines")
+    parser.add_argument(
+        "--worker", nargs=2, metavar=("SCENARIO", "N"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.worker:
+        scenario, n = args.worker
+        print(json.dumps(measure(scenario, int(n), Path.cwd())))
+        return
+
+    args.scenarios = args.scenarios or SIZE_SCENARIOS.get(args.size, list(SCENARIOS))
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"cenários desconhecidos: {sorted(unknown)}")
+
+    baselines = load_baselines()
+    n = SIZES[args.size]
+    failed = False
+
+    for scenario in args.scenarios:
+        key = f"{scenario}/{args.size}"
+        result = run_isolated(scenario, n)
+
+        line = (
+            f"{key:<18} {result['events_per_sec']:>11.1f}/s  "
+            f"p50 {result['p50_ms']:>8.3f} ms  p99 {result['p99_ms']:>8.3f} ms  "
+            f"rss {result['peak_rss_mb']:>7.1f} MB"
+        )
+
+        baseline = baselines["results"].get(key)
+        if args.update:
+            baselines["results"][key] = result
+        elif baseline is None:
+            line += "  (sem baseline)"
+        else:
+            regressions = compare(result, baseline, args.threshold)
+            failed |= bool(regressions)
+            line += "  " + ("; ".join(regressions) if regressions else "ok")
+
+        print(line)
+
+    if args.update:
+        baselines["machine"] = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        }
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baselines gravadas em {BASELINES}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
+import re
+import threading
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
 
 from cortex.contracts import Event
 
@@ -18,31 +20,115 @@ class Topic(str, Enum):
     UNKNOWN = "unknown"
 
 
-def classify_event(event: Event) -> Dict[str, Any]:
-    text = event.payload.get("text", "").lower()
+# (campo, rótulo) -> ex.: ("intent", Intent.COMMAND), ("topic", Topic.FOOD)
+Label = Tuple[str, Any]
+
+
+class KeywordClassifier:
+    """
+    Compila as tabelas de palavras-chave em uma única expressão regular e
+    encontra todas as ocorrências em uma passada sobre o texto.
+
+    As regras são aplicadas na ordem de registro: a última regra que casar
+    define o valor do seu campo e a confiança (mesma precedência dos `if`
+    encadeados que existiam aqui antes).
+    """
+
+    DEFAULTS = {"intent": Intent.CHAT, "topic": Topic.UNKNOWN, "confidence": 0.5}
+
+    def __init__(self):
+        self._rules: List[Tuple[Label, float, Tuple[str, ...]]] = []
+        self._lock = threading.Lock()
+        self._pattern: re.Pattern | None = None
+        self._labels: Dict[str, FrozenSet[Label]] = {}
+
+    def register(
+        self, field: str, value: Any, keywords: Iterable[str], confidence: float
+    ):
+        with self._lock:
+            words = tuple(word.lower() for word in keywords)
+            self._rules.append(((field, value), confidence, words))
+            self._pattern = None  # recompila no próximo uso
+
+    def _compile(self) -> re.Pattern:
+        by_word: Dict[str, Set[Label]] = {}
+        for label, _, words in self._rules:
+            for word in words:
+                by_word.setdefault(word, set()).add(label)
+
+        # Em cada posição a alternância devolve a palavra mais longa; as
+        # palavras que são prefixo dela casariam na mesma posição, então os
+        # rótulos delas são herdados para preservar a semântica de substring.
+        self._labels = {
+            word: frozenset(
+                label
+                for other, labels in by_word.items()
+                if word.startswith(other)
+                for label in labels
+            )
+            for word in by_word
+        }
+
+        words = sorted(by_word, key=len, reverse=True)
+        alternation = "|".join(re.escape(word) for word in words) or "(?!)"
+        return re.compile(f"(?=({alternation}))")
 
-    intent = Intent.CHAT
-    topic = Topic.UNKNOWN
-    confidence = 0.5
+    def matches(self, text: str) -> Set[Label]:
+        pattern = self._pattern
+        if pattern is None:
+            with self._lock:
+                if self._pattern is None:
+                    self._pattern = self._compile()
+                pattern = self._pattern
 
-    if any(word in text for word in ["ligar", "desligar", "abrir", "fechar"]):
-        intent = Intent.COMMAND
-        confidence = 0.8
+        found: Set[Label] = set()
+        for word in pattern.findall(text.lower()):
+            found |= self._labels[word]
+        return found
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        found = self.matches(text)
+        result = dict(self.DEFAULTS)
+
+        for label, confidence, _ in self._rules:
+            if label in found:
+                field, value = label
+                result[field] = value
+                result["confidence"] = confidence
+
+        return result
+
+
+CLASSIFIER = KeywordClassifier()
+CLASSIFIER.register(
+    "intent", Intent.COMMAND, ["ligar", "desligar", "abrir", "fechar"], 0.8
+)
+CLASSIFIER.register(
+    "topic", Topic.FOOD, ["bolo", "cookie", "comida", "receita", "torta"], 0.7
+)
+CLASSIFIER.register("topic", Topic.WEATHER, ["chuva", "clima", "tempo"], 0.7)
+CLASSIFIER.register(
+    "topic", Topic.RELATIONSHIP, ["namorado", "namorada", "marido", "esposa"], 0.7
+)
+
+
+def register_topic(topic: Any, keywords: Iterable[str], confidence: float = 0.7):
+    CLASSIFIER.register("topic", topic, keywords, confidence)
+
+
+def classify_event(event: Event) -> Dict[str, Any]:
+    return CLASSIFIER.classify(event.payload.get("text", ""))
 
-    if any(word in text for word in ["bolo", "cookie", "comida", "receita", "torta"]):
-        topic = Topic.FOOD
-        confidence = 0.7
 
-    if any(word in text for word in ["chuva", "clima", "tempo"]):
-        topic = Topic.WEATHER
-        confidence = 0.7
+def classify_events(events: List[Event]) -> List[Dict[str, Any]]:
+    # lotes vindos das bridges repetem muito texto: classifica cada texto uma vez
+    cache: Dict[str, Dict[str, Any]] = {}
+    results = []
 
-    if any(word in text for word in ["namorado", "namorada", "marido", "esposa"]):
-        topic = Topic.RELATIONSHIP
-        confidence = 0.7
+    for event in events:
+        text = event.payload.get("text", "")
+        if text not in cache:
+            cache[text] = CLASSIFIER.classify(text)
+        results.append(dict(cache[text]))
 
-    return {
-        "intent": intent,
-        "topic": topic,
-        "confidence": confidence,
-    }
+    return results
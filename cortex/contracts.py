@@ -1,29 +1,79 @@
 import time
 import uuid
-from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, Optional
 
 from pydantic import BaseModel
 
 
-@dataclass
 class ConversationEvent:
-    event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    timestamp: float = field(default_factory=time.time)
+    """
+    Um turno de conversa. Sem `__dict__` por instância; o `event_id` e o
+    dicionário de `metadata` só são criados quando alguém os acessa.
+    """
 
-    # origem
-    stream: str = ""  # terminal | http | whatsapp | telegram | lumen
-    user_id: str = ""  # identificador único dentro da stream
-    session_id: Optional[str] = None
+    __slots__ = (
+        "_event_id",
+        "timestamp",
+        "stream",
+        "user_id",
+        "session_id",
+        "agent_hint",
+        "modality",
+        "content",
+        "_metadata",
+    )
 
-    # intenção
-    agent_hint: Optional[str] = None  # lucia | dominus | None
-    modality: str = "text"  # text | voice | image
+    def __init__(
+        self,
+        event_id: Optional[str] = None,
+        timestamp: Optional[float] = None,
+        # origem
+        stream: str = "",  # terminal | http | whatsapp | telegram | lumen
+        user_id: str = "",  # identificador único dentro da stream
+        session_id: Optional[str] = None,
+        # intenção
+        agent_hint: Optional[str] = None,  # lucia | dominus | None
+        modality: str = "text",  # text | voice | image
+        # conteúdo
+        content: Any = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self._event_id = event_id
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.stream = stream
+        self.user_id = user_id
+        self.session_id = session_id
+        self.agent_hint = agent_hint
+        self.modality = modality
+        self.content = content
+        self._metadata = metadata or None
 
-    # conteúdo
-    content: Any = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    @property
+    def event_id(self) -> str:
+        if self._event_id is None:
+            self._event_id = str(uuid.uuid4())
+        return self._event_id
+
+    @event_id.setter
+    def event_id(self, value: str):
+        self._event_id = value
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]):
+        self._metadata = value
+
+    def __repr__(self) -> str:
+        return (
+            f"ConversationEvent(stream={self.stream!r}, user_id={self.user_id!r}, "
+            f"agent_hint={self.agent_hint!r}, content={self.content!r})"
+        )
 
 
 class EventType(str, Enum):
@@ -54,11 +104,45 @@ class Action(BaseModel):
     priority: int = 0
 
     @classmethod
-    def no_op(cls, reason: str | None = None) -> "Action":
-        return cls(
-            type=ActionType.NO_OP,
-            target="system",
-            payload={"reason": reason} if reason else {},
-            confidence=0.0,
-            priority=-1,
+    def fast(
+        cls,
+        type: ActionType,
+        target: str,
+        payload: Dict[str, Any],
+        confidence: float = 0.10,
+        priority: int = 0,
+    ) -> "Action":
+        """
+        Constrói sem validação (`model_construct`). Só para código interno
+        que já passa os tipos certos: agentes, policies e o cortex.
+        """
+        return cls.model_construct(
+            type=type,
+            target=target,
+            payload=payload,
+            confidence=confidence,
+            priority=priority,
         )
+
+    @classmethod
+    def no_op(cls, reason: str | None = None) -> "Action":
+        # um único NO_OP por motivo; ninguém altera ações depois de criadas
+        key = (cls, reason)
+        action = _NO_OPS.get(key)
+
+        if action is None:
+            action = _NO_OPS.setdefault(
+                key,
+                cls.fast(
+                    type=ActionType.NO_OP,
+                    target="system",
+                    payload={"reason": reason} if reason else {},
+                    confidence=0.0,
+                    priority=-1,
+                ),
+            )
+
+        return action
+
+
+_NO_OPS: Dict[Any, Action] = {}
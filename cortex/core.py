@@ -1,20 +1,22 @@
+import asyncio
 from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from cortex.classify import classify_event
+from cortex.classify import classify_event, classify_events
 from cortex.contracts import (  # models continuam no app por enquanto
     Action,
     ActionType,
     Event,
 )
-from cortex.decision import DecisionLayer
+from cortex.decision import Candidate, DecisionLayer
 from cortex.policies import ChatPolicy, FoodPolicy, PolicyEngine
-from cortex.state import STATE
 from cortex.veto import VetoLayer
 from echo.echo import Echo
 from guard.guard import Guard
-from memory.store import MemoryStore
-from oracle.observer import ActionResult
-from oracle.service import OracleService
+from oracle.models import ActionResult
+from runtime.container import container
+from telemetry.log import get_logger
+from telemetry.metrics import Laps
 
 # ========================
 #   ENGINES SINGLETONS
@@ -28,85 +30,185 @@ POLICY_ENGINE = PolicyEngine(
 )
 
 DECISION_LAYER = DecisionLayer()
-MEMORY = MemoryStore()
+# candidatos reservas oferecidos ao Guard quando o melhor é bloqueado
+FALLBACK_CANDIDATES = 3
 
-ORACLE = OracleService()
 ECHO = Echo()
 
+# estado, memória, Oracle e tarefas vêm do container do processo, os
+# mesmos usados pelo NexusRuntime (criados no primeiro uso)
+SERVICES = container()
+
+LOG = get_logger("cortex.core")
+
 # ========================
 #   CORE ORCHESTRATION
 # ========================
 
 
 def handle_event(event: Event) -> Action:
-    STATE.last_event_time = datetime.now()
+    return _pipeline(event, SERVICES.oracle.observe)
+
+
+async def ahandle_event(event: Event) -> Action:
+    """
+    Versão assíncrona: o pipeline inteiro (memória, classificação, Oracle)
+    roda numa thread do executor, e o loop segue atendendo as outras
+    conexões enquanto isso.
+    """
+    return await asyncio.to_thread(handle_event, event)
+
+
+def handle_events(events: List[Event]) -> List[Action]:
+    """
+    Processa um lote em ordem: classificação feita de uma vez para o lote
+    e uma única transação no Oracle para todas as observações.
+    """
+    actions, observations = _batch(events)
+    SERVICES.oracle.observe_many(observations)
+    return actions
+
+
+async def ahandle_events(events: List[Event]) -> List[Action]:
+    return await asyncio.to_thread(handle_events, events)
+
+
+def _batch(events: List[Event]):
+    observations: List[Dict[str, Any]] = []
+    classifications = classify_events(events)
+
+    actions = [
+        _pipeline(event, lambda **kw: observations.append(kw), classification)
+        for event, classification in zip(events, classifications)
+    ]
+
+    return actions, observations
+
+
+def _pipeline(
+    event: Event,
+    observe: Callable[..., None],
+    classification: Dict[str, Any] | None = None,
+) -> Action:
+    laps = SERVICES.metrics.start("core")
+    action, chosen = _stages(event, observe, classification, laps)
+
+    # rotulado pela policy escolhida e pela ação que ela propôs
+    if chosen is None:
+        laps.finish(None, action.type)
+    else:
+        laps.finish(chosen.origin, chosen.action.type)
+    return action
+
+
+def _stages(
+    event: Event,
+    observe: Callable[..., None],
+    classification: Dict[str, Any] | None,
+    laps: Laps,
+) -> Tuple[Action, Optional[Candidate]]:
+    state, memory = SERVICES.global_state, SERVICES.memory
+    state.last_event_time = datetime.now()
 
     # ---- Memory ----
     text = event.payload.get("text")
+    user_id = event.payload.get("user_id")
     if text:
-        MEMORY.remember(event.source, text)
+        memory.remember(event.source, text, user_id)
 
-    recent_context = MEMORY.recall(event.source)
+    recent_context = memory.recall(event.source, user_id=user_id)
     # futuramente isso entra no prompt / contexto
-    print(recent_context)
+    LOG.debug("contexto recente", source=event.source, context=recent_context)
+    laps.mark("memory")
 
     # ---- Classification ----
-    classification = classify_event(event)
+    if classification is None:
+        classification = classify_event(event)
+    laps.mark("classify")
 
     # ---- Policies ----
-    proposed_actions = POLICY_ENGINE.run(event, classification)
+    proposals = POLICY_ENGINE.propose(event, classification)
+    laps.mark("policies")
 
     # ---- Decision ----
-    final_action = DECISION_LAYER.decide(proposed_actions)
+    candidates = DECISION_LAYER.select(proposals, k=FALLBACK_CANDIDATES)
+    laps.mark("decision")
 
-    if not final_action:
-        ORACLE.observe(
+    if not candidates:
+        observe(
             event=event,
             action=Action.no_op("no_action"),
             result=ActionResult.IGNORED,
             metadata={"reason": "no_action"},
         )
-
-        return Action(
-            type=ActionType.LOG,
-            target="system",
-            payload={"info": "no action decided"},
+        laps.mark("oracle")
+
+        return (
+            Action.fast(
+                type=ActionType.LOG,
+                target="system",
+                payload={"info": "no action decided"},
+            ),
+            None,
         )
 
     # ---- Guard ----
     guard = Guard()
-    guard_result = guard.check(final_action, STATE)
-
-    if not guard_result.allowed:
-        return Action(
-            type=ActionType.LOG,
-            target="system",
-            payload={"blocked_by": guard_result.reason},
+    chosen, blocked_by = None, None
+
+    for candidate in candidates:
+        guard_result = guard.check(candidate.action, state)
+        if guard_result.allowed:
+            chosen = candidate
+            break
+        if blocked_by is None:
+            blocked_by = guard_result.reason
+    laps.mark("guard")
+
+    if chosen is None:
+        return (
+            Action.fast(
+                type=ActionType.LOG,
+                target="system",
+                payload={"blocked_by": blocked_by},
+            ),
+            None,
         )
 
+    final_action = chosen.action
+
     # ---- Veto ----
     veto = VetoLayer()
-    if veto.veto(final_action, classification):
-        ORACLE.observe(
+    vetoed = veto.veto(final_action, classification)
+    laps.mark("veto")
+    if vetoed:
+        observe(
             event=event,
             action=final_action,
             result=ActionResult.IGNORED,
-            metadata={"reason": "veto"},
+            metadata={"reason": "veto", "policy": chosen.origin},
         )
-
-        return Action(
-            type=ActionType.LOG,
-            target="system",
-            payload={"vetoed": True},
+        laps.mark("oracle")
+
+        return (
+            Action.fast(
+                type=ActionType.LOG,
+                target="system",
+                payload={"vetoed": True},
+            ),
+            chosen,
         )
 
-    STATE.last_action_time = datetime.now()
+    state.last_action_time = datetime.now()
 
     result = ECHO.execute(final_action)
+    laps.mark("echo")
 
-    ORACLE.observe(
+    observe(
         event=event,
         action=final_action,
         result=result,  # por enquanto sempre sucesso
+        metadata={"policy": chosen.origin},
     )
-    return final_action
+    laps.mark("oracle")
+    return final_action, chosen
@@ -1,25 +1,54 @@
-from typing import List, Optional
+import heapq
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple, Union
 
 from cortex.contracts import Action, ActionType, ConversationEvent
-from cortex.state import SessionManager
+from cortex.state import Session, SessionManager
 
 
-class DecisionLayer:
-    def decide(self, actions: List[Action]) -> Optional[Action]:
-        if not actions:
-            return None
+@dataclass(frozen=True)
+class Candidate:
+    action: Action
+    origin: Optional[str] = None  # policy / agente que propôs a ação
+    order: int = 0  # ordem de registro, usada como desempate
+
 
-        actions = [a for a in actions if a.type != ActionType.NO_OP]
+def _rank(candidate: Candidate) -> Tuple[int, float, int]:
+    # maior prioridade, depois maior confiança, depois quem veio primeiro
+    action = candidate.action
+    return (action.priority, action.confidence, -candidate.order)
 
-        if not actions:
-            return None
 
-        actions.sort(
-            key=lambda a: (a.priority, a.confidence),
-            reverse=True,
+def _as_candidates(
+    actions: Iterable[Union[Action, Candidate]],
+) -> Iterable[Candidate]:
+    for order, item in enumerate(actions):
+        candidate = (
+            item if isinstance(item, Candidate) else Candidate(item, None, order)
         )
+        if candidate.action.type != ActionType.NO_OP:
+            yield candidate
+
+
+class DecisionLayer:
+    def decide(self, actions: List[Union[Action, Candidate]]) -> Optional[Action]:
+        best = self.select(actions, k=1)
+        return best[0].action if best else None
+
+    def select(
+        self, actions: Iterable[Union[Action, Candidate]], k: int = 1
+    ) -> List[Candidate]:
+        """
+        Os `k` melhores candidatos em uma única passada (`max` para k=1,
+        heap para k>1), do melhor para o pior.
+        """
+        candidates = _as_candidates(actions)
 
-        return actions[0]
+        if k == 1:
+            best = max(candidates, key=_rank, default=None)
+            return [best] if best is not None else []
+
+        return heapq.nlargest(k, candidates, key=_rank)
 
 
 class DecisionEngine:
@@ -27,13 +56,20 @@ class DecisionEngine:
         self.sessions = session_manager
 
     def decide_agent(self, event: ConversationEvent) -> str:
+        return self.resolve(event)[0]
+
+    def resolve(self, event: ConversationEvent) -> Tuple[str, Optional[Session]]:
+        """
+        Agente que atende o evento e a sessão ativa (ou recém-aberta), com
+        uma única consulta ao SessionManager.
+        """
         # 1 Existe sessão ativa?
         session = self.sessions.get_session(event.user_id, event.stream)
 
         if session:
             self.sessions.update_activity(session)
             event.session_id = session.session_id
-            return session.agent
+            return session.agent, session
 
         # 2 Usuário chamou alguém explicitamente?
         if event.agent_hint:
@@ -43,7 +79,7 @@ class DecisionEngine:
                 agent=event.agent_hint,
             )
             event.session_id = session.session_id
-            return session.agent
+            return session.agent, session
 
         # 3 Nenhuma sessão, nenhum hint → fallback
-        return "lucia"
+        return "lucia", None
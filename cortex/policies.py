@@ -1,12 +1,20 @@
-from typing import Any, Dict, List
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 from cortex.classify import Intent, Topic
 from cortex.contracts import Action, ActionType, Event
+from cortex.decision import Candidate
 
 
 class BasePolicy:
     name = "base"
 
+    # Rótulos da classificação que interessam à policy. O PolicyEngine usa
+    # isso para indexar as policies; None = não declarado (sempre avaliada).
+    intents: Optional[FrozenSet[Any]] = None
+    topics: Optional[FrozenSet[Any]] = None
+
     def applies(self, event: Event, classification: Dict[str, Any]) -> bool:
         return False
 
@@ -16,13 +24,14 @@ class BasePolicy:
 
 class ChatPolicy(BasePolicy):
     name = "chat_policy"
+    intents = frozenset({Intent.CHAT})
 
     def applies(self, event: Event, classification: Dict[str, Any]) -> bool:
         return classification["intent"] == Intent.CHAT
 
     def evaluate(self, event: Event, classification: Dict[str, Any]) -> List[Action]:
         return [
-            Action(
+            Action.fast(
                 type=ActionType.SEND_MESSAGE,
                 target=event.source,
                 payload={"text": "Estou ouvindo."},
@@ -34,13 +43,14 @@ class ChatPolicy(BasePolicy):
 
 class FoodPolicy(BasePolicy):
     name = "food_policy"
+    topics = frozenset({Topic.FOOD})
 
     def applies(self, event: Event, classification: Dict[str, Any]) -> bool:
         return classification["topic"] == Topic.FOOD
 
     def evaluate(self, event: Event, classification: Dict[str, Any]) -> List[Action]:
         return [
-            Action(
+            Action.fast(
                 type=ActionType.SEND_MESSAGE,
                 target=event.source,
                 payload={"text": "Posso sugerir uma receita se quiser."},
@@ -50,15 +60,86 @@ class FoodPolicy(BasePolicy):
         ]
 
 
+@dataclass
+class PolicyTiming:
+    calls: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+    def record(self, elapsed_ns: int):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        self.max_ns = max(self.max_ns, elapsed_ns)
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+
 class PolicyEngine:
-    def __init__(self, policies: List[BasePolicy]):
-        self.policies = policies
+    def __init__(self, policies: List[BasePolicy], timing: bool = False):
+        self.policies = list(policies)
+        self.timing = timing
+        self.timings: Dict[str, PolicyTiming] = {}
+
+        # (intent, topic) -> policies candidatas, na ordem de registro
+        self._index: Dict[Tuple[Any, Any], List[BasePolicy]] = {}
+
+    def register(self, policy: BasePolicy):
+        self.policies.append(policy)
+        self._index.clear()
+
+    def candidates(self, classification: Dict[str, Any]) -> List[BasePolicy]:
+        key = (classification.get("intent"), classification.get("topic"))
+
+        candidates = self._index.get(key)
+        if candidates is None:
+            candidates = [p for p in self.policies if _may_apply(p, *key)]
+            self._index[key] = candidates
+
+        return candidates
 
     def run(self, event: Event, classification: Dict[str, Any]) -> List[Action]:
-        actions: List[Action] = []
+        return [c.action for c in self.propose(event, classification)]
+
+    def propose(self, event: Event, classification: Dict[str, Any]) -> List[Candidate]:
+        """Como `run`, mas cada ação guarda a policy de origem."""
+        proposals: List[Candidate] = []
+
+        for policy in self.candidates(classification):
+            if self.timing:
+                start = time.perf_counter_ns()
 
-        for policy in self.policies:
             if policy.applies(event, classification):
-                actions.extend(policy.evaluate(event, classification))
+                for action in policy.evaluate(event, classification):
+                    proposals.append(Candidate(action, policy.name, len(proposals)))
+
+            if self.timing:
+                self._timing(policy.name).record(time.perf_counter_ns() - start)
+
+        return proposals
+
+    def _timing(self, name: str) -> PolicyTiming:
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = PolicyTiming()
+        return timing
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "calls": t.calls,
+                "total_ms": t.total_ns / 1e6,
+                "mean_us": t.mean_ns / 1e3,
+                "max_us": t.max_ns / 1e3,
+            }
+            for name, t in self.timings.items()
+        }
+
+
+def _may_apply(policy: BasePolicy, intent: Any, topic: Any) -> bool:
+    return _declares(policy.intents, intent) and _declares(policy.topics, topic)
+
 
-        return actions
+def _declares(labels: Iterable[Any] | None, value: Any) -> bool:
+    return labels is None or value in labels
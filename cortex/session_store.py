@@ -0,0 +1,258 @@
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from cortex.state import Session, SessionBackend
+
+
+class SqliteSessionBackend(SessionBackend):
+    """
+    Sessões compartilhadas entre processos via um arquivo SQLite em modo WAL.
+
+    Abrir e fechar sessões são escritas atômicas imediatas. Já as
+    atualizações de atividade (e do `context`) ficam acumuladas no processo
+    e são gravadas em lote a cada `flush_interval` segundos, então o caminho
+    quente não escreve no banco a cada mensagem.
+
+    Dentro do processo, a mesma sessão é sempre o mesmo objeto, para que
+    alterações em `session.context` feitas pelos agentes não se percam.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        flush_interval: float = 1.0,
+        timeout: float = 120,
+    ):
+        self.db_path = Path(path)
+        self.flush_interval = flush_interval
+        # uma sessão só é substituída por outro processo depois de expirar
+        self.timeout = timeout
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                key TEXT PRIMARY KEY,
+                session_id TEXT,
+                user_id TEXT,
+                stream TEXT,
+                agent TEXT,
+                state TEXT,
+                last_activity REAL,
+                context TEXT
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_activity "
+            "ON sessions (last_activity)"
+        )
+
+        # key -> objeto da sessão neste processo; _dirty: tocadas sem gravar
+        self._local: Dict[str, Session] = {}
+        self._dirty: Set[str] = set()
+        self._last_flush = time.monotonic()
+
+        atexit.register(self.close)
+
+    @staticmethod
+    def _to_session(row: tuple) -> Session:
+        return Session(
+            session_id=row[0],
+            user_id=row[1],
+            stream=row[2],
+            agent=row[3],
+            state=row[4],
+            last_activity=row[5],
+            context=json.loads(row[6]) if row[6] else {},
+        )
+
+    def get(self, key: str) -> Optional[Session]:
+        with self._lock:
+            self._maybe_flush()
+
+            row = self._conn.execute(
+                """
+                SELECT session_id, user_id, stream, agent, state,
+                       last_activity, context
+                FROM sessions WHERE key = ?
+                """,
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                self._forget(key)
+                return None
+
+            local = self._local.get(key)
+            if local is not None and local.session_id == row[0]:
+                if key not in self._dirty:
+                    # sem alterações locais: adota o que outro processo gravou
+                    local.agent, local.state = row[3], row[4]
+                    local.context = json.loads(row[6]) if row[6] else {}
+                # outro processo pode ter registrado atividade mais recente
+                local.last_activity = max(local.last_activity, row[5])
+                return local
+
+            session = self._to_session(row)
+            self._local[key] = session
+            self._dirty.discard(key)
+            return session
+
+    def _forget(self, key: str):
+        self._local.pop(key, None)
+        self._dirty.discard(key)
+
+    def put(self, key: str, session: Session) -> Session:
+        with self._lock:
+            self._forget(key)
+
+            # Só substitui uma sessão existente se ela já estiver inativa há
+            # mais tempo que a nova; se outro processo abriu uma sessão viva
+            # ao mesmo tempo, ela prevalece e é devolvida.
+            self._conn.execute(
+                """
+                INSERT INTO sessions (
+                    key, session_id, user_id, stream, agent, state,
+                    last_activity, context
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    session_id = excluded.session_id,
+                    user_id = excluded.user_id,
+                    stream = excluded.stream,
+                    agent = excluded.agent,
+                    state = excluded.state,
+                    last_activity = excluded.last_activity,
+                    context = excluded.context
+                WHERE sessions.session_id = excluded.session_id
+                   OR sessions.last_activity < ?
+                """,
+                (
+                    key,
+                    session.session_id,
+                    session.user_id,
+                    session.stream,
+                    session.agent,
+                    session.state,
+                    session.last_activity,
+                    json.dumps(session.context, default=str),
+                    session.last_activity - self.timeout,
+                ),
+            )
+
+            row = self._conn.execute(
+                "SELECT session_id FROM sessions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and row[0] == session.session_id:
+                self._local[key] = session
+                return session
+
+            current = self.get(key)
+            return current if current is not None else session
+
+    def touch(self, key: str, session: Session):
+        with self._lock:
+            self._local[key] = session
+            self._dirty.add(key)
+            self._maybe_flush()
+
+    def delete(self, key: str, session: Session | None = None):
+        with self._lock:
+            self._forget(key)
+            if session is None:
+                self._conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+            else:
+                self._conn.execute(
+                    "DELETE FROM sessions WHERE key = ? AND session_id = ?",
+                    (key, session.session_id),
+                )
+
+    def reap(self, cutoff: float) -> int:
+        with self._lock:
+            self.flush()
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE last_activity < ?", (cutoff,)
+            )
+
+            for key, session in list(self._local.items()):
+                if session.last_activity < cutoff:
+                    self._forget(key)
+
+            return cursor.rowcount
+
+    def evict(self, max_sessions: int) -> int:
+        with self._lock:
+            self.flush()
+            cursor = self._conn.execute(
+                """
+                DELETE FROM sessions WHERE key IN (
+                    SELECT key FROM sessions
+                    ORDER BY last_activity ASC
+                    LIMIT max(0, (SELECT COUNT(*) FROM sessions) - ?)
+                )
+                """,
+                (max_sessions,),
+            )
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._dirty:
+                return
+
+            pending = {key: self._local[key] for key in self._dirty}
+            self._dirty.clear()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    """
+                    UPDATE sessions
+                    SET last_activity = max(last_activity, ?),
+                        state = ?, agent = ?, context = ?
+                    WHERE key = ? AND session_id = ?
+                    """,
+                    [
+                        (
+                            s.last_activity,
+                            s.state,
+                            s.agent,
+                            json.dumps(s.context, default=str),
+                            key,
+                            s.session_id,
+                        )
+                        for key, s in pending.items()
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+        atexit.unregister(self.close)
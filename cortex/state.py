@@ -1,62 +1,284 @@
+import os
+import threading
 import time
 import uuid
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 
-@dataclass
 class Session:
-    session_id: str
-    user_id: str
-    stream: str
-    agent: str
-    state: str = "IDLE"
-    last_activity: float = field(default_factory=time.time)
+    """
+    Sessão de um usuário em uma stream. Sem `__dict__` por instância; o
+    `context` só é criado quando alguém o acessa. O `session_id` também é
+    gerado no primeiro acesso, o que poupa o uuid4 de sessões que nunca
+    passam pelo roteamento (ele o lê a cada evento).
+    """
+
+    __slots__ = (
+        "_session_id",
+        "user_id",
+        "stream",
+        "agent",
+        "state",
+        "last_activity",
+        "_context",
+    )
+
+    def __init__(
+        self,
+        session_id: Optional[str],
+        user_id: str,
+        stream: str,
+        agent: str,
+        state: str = "IDLE",
+        last_activity: Optional[float] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ):
+        self._session_id = session_id
+        self.user_id = user_id
+        self.stream = stream
+        self.agent = agent
+        self.state = state
+        self.last_activity = time.time() if last_activity is None else last_activity
+        self._context = context or None
+
+    @property
+    def session_id(self) -> str:
+        if self._session_id is None:
+            self._session_id = str(uuid.uuid4())
+        return self._session_id
+
+    @property
+    def context(self) -> Dict[str, Any]:
+        if self._context is None:
+            self._context = {}
+        return self._context
+
+    @context.setter
+    def context(self, value: Dict[str, Any]):
+        self._context = value
+
+    def __repr__(self) -> str:
+        return (
+            f"Session(user_id={self.user_id!r}, stream={self.stream!r}, "
+            f"agent={self.agent!r}, state={self.state!r})"
+        )
 
 
 @dataclass
 class GlobalState:
     last_action_time: Optional[datetime] = None
+    last_event_time: Optional[datetime] = None
+
+
+class SessionBackend:
+    """
+    Onde as sessões ficam guardadas. As chaves são `stream:user_id`; a
+    política (timeout, limite) fica no SessionManager.
+    """
+
+    def get(self, key: str) -> Optional[Session]:
+        raise NotImplementedError
+
+    def put(self, key: str, session: Session) -> Session:
+        # abre a sessão atomicamente; devolve a sessão que ficou valendo
+        raise NotImplementedError
+
+    def touch(self, key: str, session: Session):
+        raise NotImplementedError
+
+    def delete(self, key: str, session: Session | None = None):
+        raise NotImplementedError
+
+    def reap(self, cutoff: float) -> int:
+        # remove sessões com last_activity < cutoff; devolve quantas
+        raise NotImplementedError
+
+    def evict(self, max_sessions: int) -> int:
+        # despeja as menos ativas até sobrarem max_sessions; devolve quantas
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InMemorySessionBackend(SessionBackend):
+    """
+    Sessões em um OrderedDict ordenado pela última atividade: a busca é
+    O(1) e as expiradas ficam sempre no início, então `reap` remove em
+    lote sem varrer as ativas.
+    """
+
+    def __init__(self):
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Session]:
+        return self.sessions.get(key)
+
+    def put(self, key: str, session: Session) -> Session:
+        with self._lock:
+            self.sessions[key] = session
+            self.sessions.move_to_end(key)
+        return session
+
+    def touch(self, key: str, session: Session):
+        with self._lock:
+            if self.sessions.get(key) is session:
+                self.sessions.move_to_end(key)
+
+    def delete(self, key: str, session: Session | None = None):
+        with self._lock:
+            current = self.sessions.get(key)
+            if current is not None and (session is None or current is session):
+                del self.sessions[key]
+
+    def reap(self, cutoff: float) -> int:
+        removed = 0
+
+        with self._lock:
+            while self.sessions:
+                session = next(iter(self.sessions.values()))
+                if session.last_activity >= cutoff:
+                    break
+                self.sessions.popitem(last=False)
+                removed += 1
+
+        return removed
+
+    def evict(self, max_sessions: int) -> int:
+        evicted = 0
+
+        with self._lock:
+            while len(self.sessions) > max_sessions:
+                self.sessions.popitem(last=False)
+                evicted += 1
+
+        return evicted
+
+    def count(self) -> int:
+        return len(self.sessions)
+
+
+def default_session_backend() -> SessionBackend:
+    # NEXUS_SESSION_DB compartilha as sessões entre processos (ex.: workers
+    # do uvicorn) por um arquivo SQLite em modo WAL
+    path = os.environ.get("NEXUS_SESSION_DB")
+    if path:
+        from cortex.session_store import SqliteSessionBackend
+
+        return SqliteSessionBackend(path, timeout=SessionManager.TIMEOUT_SECONDS)
+
+    return InMemorySessionBackend()
 
 
 class SessionManager:
+    """
+    Política de sessões (timeout, limite com despejo LRU, reaper periódico)
+    sobre um SessionBackend plugável.
+    """
+
     TIMEOUT_SECONDS = 120
+    REAP_INTERVAL_SECONDS = 30
 
-    def __init__(self):
-        self.sessions: Dict[str, Session] = {}
+    def __init__(
+        self,
+        max_sessions: int | None = None,
+        backend: SessionBackend | None = None,
+    ):
+        self.backend = backend or default_session_backend()
+        self.max_sessions = max_sessions
+
+        self.expired_count = 0
+        self.evicted_count = 0
+
+        self._lock = threading.Lock()
+        self._reaper: threading.Thread | None = None
+        self._stop_reaper = threading.Event()
 
     def _key(self, user_id: str, stream: str) -> str:
         return f"{stream}:{user_id}"
 
+    def _count(self, expired: int = 0, evicted: int = 0):
+        if expired or evicted:
+            with self._lock:
+                self.expired_count += expired
+                self.evicted_count += evicted
+
     def get_session(self, user_id: str, stream: str) -> Optional[Session]:
         key = self._key(user_id, stream)
-        session = self.sessions.get(key)
+        session = self.backend.get(key)
 
         if not session:
             return None
 
         if time.time() - session.last_activity > self.TIMEOUT_SECONDS:
-            del self.sessions[key]
+            self.backend.delete(key, session)
+            self._count(expired=1)
             return None
 
         return session
 
     def start_session(self, user_id: str, stream: str, agent: str) -> Session:
         session = Session(
-            session_id=str(uuid.uuid4()),
+            session_id=None,
             user_id=user_id,
             stream=stream,
             agent=agent,
             state="IN_CONVERSATION",
         )
-        self.sessions[self._key(user_id, stream)] = session
+
+        self.reap()
+        session = self.backend.put(self._key(user_id, stream), session)
+
+        if self.max_sessions is not None:
+            self._count(evicted=self.backend.evict(self.max_sessions))
+
         return session
 
     def update_activity(self, session: Session):
         session.last_activity = time.time()
+        self.backend.touch(self._key(session.user_id, session.stream), session)
 
     def close(self, session: Session):
-        key = self._key(session.user_id, session.stream)
-        if key in self.sessions:
-            del self.sessions[key]
+        self.backend.delete(self._key(session.user_id, session.stream), session)
+
+    def reap(self) -> int:
+        """Remove em lote as sessões expiradas."""
+        removed = self.backend.reap(time.time() - self.TIMEOUT_SECONDS)
+        self._count(expired=removed)
+        return removed
+
+    def start_reaper(self, interval: float | None = None):
+        if self._reaper is not None:
+            return
+
+        interval = interval or self.REAP_INTERVAL_SECONDS
+        self._stop_reaper.clear()
+
+        def loop():
+            while not self._stop_reaper.wait(interval):
+                self.reap()
+
+        self._reaper = threading.Thread(target=loop, name="session-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self):
+        if self._reaper is None:
+            return
+
+        self._stop_reaper.set()
+        self._reaper.join()
+        self._reaper = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active": self.backend.count(),
+            "expired": self.expired_count,
+            "evicted": self.evicted_count,
+        }
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Any, Callable, Optional, Set
+
+from telemetry.log import get_logger
+
+LOG = get_logger("cortex.tasks")
+
+# tarefas em voo antes de aplicar contrapressão
+MAX_IN_FLIGHT = 64
+
+
+class BackgroundTasks:
+    """
+    Agenda efeitos colaterais bloqueantes (escrita em memória) em threads
+    do executor padrão, fora do caminho da resposta. Com `max_in_flight`
+    tarefas pendentes, `spawn` roda a função na hora: quem produz mais
+    rápido do que as threads gravam passa a esperar, em vez de acumular
+    tarefas sem limite.
+    """
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self.saturated = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    def spawn(self, fn: Callable[..., Any], *args, **kwargs) -> Optional[asyncio.Task]:
+        if len(self._tasks) >= self.max_in_flight:
+            self.saturated += 1
+            fn(*args, **kwargs)
+            return None
+
+        loop = asyncio.get_running_loop()
+        task = loop.create_task(asyncio.to_thread(fn, *args, **kwargs))
+
+        # mantém a referência até o fim (o loop só guarda referências fracas)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            LOG.error("tarefa em segundo plano falhou", task.exception())
+
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self):
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -11,9 +11,9 @@ class VetoLayer:
         classification: Dict[str, Any],
     ) -> bool:
         if (
-            classification["intent"] == Intent.CHAT
+            classification.get("intent") == Intent.CHAT
             and action.priority < 5
-            and classification["confidence"] < 0.7
+            and classification.get("confidence", 0.0) < 0.7
         ):
             return True
         return False
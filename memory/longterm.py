@@ -0,0 +1,110 @@
+import atexit
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class LongTermMemory:
+    """
+    Memória de longo prazo em SQLite FTS5, ranqueada por BM25.
+
+    Cada linha guarda o dono (`stream:user_id`) como um único token na
+    coluna `owner`, então a busca de um usuário usa o índice invertido
+    inteiro em vez de filtrar milhões de linhas depois do MATCH.
+    """
+
+    def __init__(self, path: Path | str = Path("memory.db"), batch_size: int = 64):
+        self.db_path = Path(path)
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, str, float]] = []
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS utterances USING fts5(
+                owner,
+                content,
+                ts UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+            """)
+        self._conn.commit()
+
+        atexit.register(self.close)
+
+    @staticmethod
+    def _owner(key: str) -> str:
+        # token único e estável, imune à tokenização de ":" e afins
+        return "o" + hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+    def add(self, key: str, content: str, ts: float | None = None):
+        with self._lock:
+            self._pending.append(
+                (self._owner(key), content, time.time() if ts is None else ts)
+            )
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending or self._conn is None:
+            return
+
+        pending, self._pending = self._pending, []
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO utterances (owner, content, ts) VALUES (?, ?, ?)",
+                pending,
+            )
+
+    def search(self, key: str, query: str, k: int = 5) -> List[str]:
+        terms = TOKEN.findall(query.lower())
+        if not terms or k <= 0:
+            return []
+
+        # cada termo entre aspas: o texto do usuário nunca vira sintaxe FTS
+        match = "owner:{} AND content:({})".format(
+            self._owner(key), " OR ".join(f'"{term}"' for term in terms)
+        )
+
+        with self._lock:
+            self._flush()
+            rows = self._conn.execute(
+                """
+                SELECT content FROM utterances
+                WHERE utterances MATCH ?
+                ORDER BY bm25(utterances, 0.0, 1.0)
+                LIMIT ?
+                """,
+                (match, k),
+            ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush()
+            self._conn.close()
+            self._conn = None
+        atexit.unregister(self.close)
+
+
+def default_long_term_memory() -> Optional[LongTermMemory]:
+    # NEXUS_MEMORY_DB liga a camada de longo prazo (desligada por padrão)
+    path = os.environ.get("NEXUS_MEMORY_DB")
+    return LongTermMemory(path) if path else None
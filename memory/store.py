@@ -1,46 +1,194 @@
 # nexus/memory/store.py
 
-from collections import deque
-from datetime import datetime
-from typing import Deque, Dict, List
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Callable, Deque, Dict, List, Optional
+
+from memory.longterm import LongTermMemory, default_long_term_memory
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
 
 
 class MemoryItem:
-    def __init__(self, content: str, timestamp: datetime):
+    __slots__ = ("content", "timestamp")
+
+    def __init__(self, content: str, timestamp: float):
         self.content = content
-        self.timestamp = timestamp
+        self.timestamp = timestamp  # epoch em segundos
 
 
 class ShortTermMemory:
-    def __init__(self, max_items: int = 20):
+    def __init__(
+        self,
+        max_items: int = 20,
+        on_evict: Callable[[MemoryItem], None] | None = None,
+    ):
         self.max_items = max_items
         self.items: Deque[MemoryItem] = deque(maxlen=max_items)
+        # recebe o item que o deque vai descartar (ex.: longo prazo)
+        self.on_evict = on_evict
+        self.bytes = 0
 
     def add(self, content: str):
+        if len(self.items) == self.max_items:
+            dropped = self.items[0]
+            self.bytes -= _size(dropped.content)
+            if self.on_evict is not None:
+                self.on_evict(dropped)
+
         self.items.append(
             MemoryItem(
                 content=content,
-                timestamp=datetime.now(),
+                timestamp=time.time(),
             )
         )
+        self.bytes += _size(content)
 
     def last(self, n: int = 3) -> List[str]:
-        return [item.content for item in list(self.items)[-n:]]
+        # percorre só os n itens do fim, sem copiar o deque
+        recent = [item.content for item in islice(reversed(self.items), n)]
+        recent.reverse()
+        return recent
 
     def clear(self):
         self.items.clear()
+        self.bytes = 0
+
+
+def _size(content: str) -> int:
+    return sys.getsizeof(content)
 
 
 class MemoryStore:
-    def __init__(self):
-        self.by_source: Dict[str, ShortTermMemory] = {}
+    """
+    Memória de curto prazo fatiada por dono (`stream:user_id`, ou só a
+    stream quando não há usuário). Um orçamento global de itens e/ou bytes
+    é mantido despejando fatias inteiras, da menos usada para a mais usada.
+
+    Com uma LongTermMemory configurada, os itens que saem do curto prazo
+    (pelo limite da fatia ou por despejo) vão para ela e continuam
+    encontráveis por `search`.
+    """
+
+    # ~10k usuários com a fatia cheia; None desliga o limite
+    MAX_ITEMS = 200_000
+
+    def __init__(
+        self,
+        long_term: LongTermMemory | None = None,
+        items_per_shard: int = 20,
+        max_items: int | None = MAX_ITEMS,
+        max_bytes: int | None = None,
+    ):
+        self.shards: "OrderedDict[str, ShortTermMemory]" = OrderedDict()
+        self.long_term = (
+            long_term if long_term is not None else default_long_term_memory()
+        )
+
+        self.items_per_shard = items_per_shard
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+
+        self.total_items = 0
+        self.total_bytes = 0
+        self.evicted_shards = 0
+
+        # o TerminalStreamServer chama de várias threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(source: str, user_id: Optional[str]) -> str:
+        return f"{source}:{user_id}" if user_id else source
+
+    def _spill(self, key: str) -> Callable[[MemoryItem], None] | None:
+        if self.long_term is None:
+            return None
 
-    def remember(self, source: str, text: str):
-        if source not in self.by_source:
-            self.by_source[source] = ShortTermMemory()
-        self.by_source[source].add(text)
+        long_term = self.long_term
+        return lambda item: long_term.add(key, item.content, item.timestamp)
 
-    def recall(self, source: str, n: int = 3) -> List[str]:
-        if source not in self.by_source:
+    def remember(self, source: str, text: str, user_id: str | None = None):
+        key = self._key(source, user_id)
+
+        with self._lock:
+            shard = self.shards.get(key)
+            if shard is None:
+                shard = ShortTermMemory(self.items_per_shard, self._spill(key))
+                self.shards[key] = shard
+            else:
+                self.shards.move_to_end(key)
+
+            items, size = len(shard.items), shard.bytes
+            shard.add(text)
+            self.total_items += len(shard.items) - items
+            self.total_bytes += shard.bytes - size
+
+            self._enforce_budget()
+
+    def _over_budget(self) -> bool:
+        return (self.max_items is not None and self.total_items > self.max_items) or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes
+        )
+
+    def _enforce_budget(self):
+        # a fatia recém-usada (a última) nunca é despejada
+        while len(self.shards) > 1 and self._over_budget():
+            _, shard = self.shards.popitem(last=False)
+            self.total_items -= len(shard.items)
+            self.total_bytes -= shard.bytes
+            self.evicted_shards += 1
+
+            if shard.on_evict is not None:
+                for item in shard.items:
+                    shard.on_evict(item)
+
+    def recall(self, source: str, n: int = 3, user_id: str | None = None) -> List[str]:
+        key = self._key(source, user_id)
+
+        with self._lock:
+            shard = self.shards.get(key)
+            if shard is None:
+                return []
+            self.shards.move_to_end(key)
+            return shard.last(n)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "shards": len(self.shards),
+            "items": self.total_items,
+            "bytes": self.total_bytes,
+            "evicted_shards": self.evicted_shards,
+        }
+
+    def search(
+        self, source: str, query: str, k: int = 5, user_id: str | None = None
+    ) -> List[str]:
+        """
+        Até `k` lembranças relevantes para `query`: primeiro as do curto
+        prazo que contêm algum termo (mais recentes antes), depois as do
+        longo prazo ranqueadas por BM25.
+        """
+        key = self._key(source, user_id)
+        terms = set(TOKEN.findall(query.lower()))
+        if not terms or k <= 0:
             return []
-        return self.by_source[source].last(n)
+
+        found: List[str] = []
+        with self._lock:
+            shard = self.shards.get(key)
+            recent = list(shard.items) if shard is not None else []
+
+        for item in reversed(recent):
+            if terms & set(TOKEN.findall(item.content.lower())):
+                found.append(item.content)
+                if len(found) == k:
+                    return found
+
+        if self.long_term is not None:
+            found += self.long_term.search(key, query, k - len(found))
+
+        return found
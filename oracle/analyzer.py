@@ -1,14 +1,186 @@
-from collections import Counter, defaultdict
+import sqlite3
+import threading
+from collections import Counter, defaultdict, deque
 from datetime import datetime, timedelta
-from statistics import mean
-from typing import List
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Tuple
 
-from oracle.models import ActionResult, InsightType, OracleInsight, OracleRecord
+from oracle.models import (
+    ActionResult,
+    InsightType,
+    OracleInsight,
+    OracleRecord,
+    OracleRollup,
+)
+from oracle.storage import to_epoch_ms, window_clause
+
+HABIT_MIN_SAMPLES = 5
+HABIT_MAX_SPREAD_HOURS = 0.5  # ~ 30 minutos
+FREQUENCY_WINDOW = timedelta(minutes=10)
+FREQUENCY_MIN_COUNT = 10
+LOW_CONFIDENCE_MIN_SAMPLES = 5
+LOW_CONFIDENCE_THRESHOLD = 0.3
+BLOCKED_RATE_THRESHOLD = 0.4
+POLICY_MIN_ATTEMPTS = 5
+
+BLOCKED_RESULTS = (ActionResult.IGNORED, ActionResult.FAILED)
+
+
+def _hour_of_day(ts: datetime) -> float:
+    return ts.hour + ts.minute / 60
+
+
+# ========================
+#   CONSTRUÇÃO DOS INSIGHTS
+# ========================
+# Cada detector é dividido em agregação + construção: os agregados podem vir
+# do histórico completo (OracleAnalyzer) ou ser mantidos registro a registro
+# (IncrementalOracleAnalyzer), e os insights gerados são os mesmos.
+
+
+def _habit_insights(
+    groups: Iterable[Tuple[str, str, int, float, float, float]],
+) -> List[OracleInsight]:
+    # groups: (source, action, samples, min_hour, max_hour, sum_hours)
+    insights = []
+
+    for source, action, samples, lo, hi, total in groups:
+        if samples < HABIT_MIN_SAMPLES:
+            continue
+
+        avg_hour = total / samples
+        variance = hi - lo
+
+        if variance <= HABIT_MAX_SPREAD_HOURS:
+            insights.append(
+                OracleInsight(
+                    type=InsightType.HABIT,
+                    source=source,
+                    description=(
+                        f"Ação {action} ocorre frequentemente "
+                        f"por volta das {int(avg_hour)}h"
+                    ),
+                    confidence=0.8,
+                    metadata={"avg_hour": avg_hour, "samples": samples},
+                )
+            )
+
+    return insights
+
+
+def _frequency_insights(
+    counts: Iterable[Tuple[str, str, int]],
+) -> List[OracleInsight]:
+    insights = []
+
+    for action, target, count in counts:
+        if count >= FREQUENCY_MIN_COUNT:
+            insights.append(
+                OracleInsight(
+                    type=InsightType.ANOMALY,
+                    source="oracle.analyzer",
+                    description=(
+                        f"Ação {action} para {target} "
+                        f"executada {count} vezes em poucos minutos"
+                    ),
+                    confidence=0.8,
+                    metadata={
+                        "action_type": action,
+                        "target": target,
+                        "count": count,
+                    },
+                )
+            )
+
+    return insights
+
+
+def _low_confidence_insights(
+    groups: Iterable[Tuple[str, int, float]],
+) -> List[OracleInsight]:
+    # groups: (action, samples, sum_confidence)
+    insights = []
+
+    for action, samples, total in groups:
+        if samples < LOW_CONFIDENCE_MIN_SAMPLES:
+            continue
+
+        avg = total / samples
+
+        if avg < LOW_CONFIDENCE_THRESHOLD:
+            insights.append(
+                OracleInsight(
+                    type=InsightType.SUGGESTION,
+                    source="oracle.analyzer",
+                    description=(
+                        f"Ação {action} apresenta confiança média baixa ({avg:.2f})"
+                    ),
+                    confidence=1 - avg,
+                    metadata={
+                        "action_type": action,
+                        "average_confidence": avg,
+                    },
+                )
+            )
+
+    return insights
+
+
+def _blocked_insights(blocked: int, total: int) -> List[OracleInsight]:
+    if total == 0:
+        return []
+
+    rate = blocked / total
+
+    if rate < BLOCKED_RATE_THRESHOLD:
+        return []
+
+    return [
+        OracleInsight(
+            type=InsightType.ANOMALY,
+            source="oracle.analyzer",
+            description=(f"Alta taxa de bloqueios detectada ({rate:.0%})"),
+            confidence=rate,
+            metadata={
+                "blocked": blocked,
+                "total": total,
+            },
+        )
+    ]
+
+
+def _policy_insights(
+    groups: Iterable[Tuple[str, int, int]],
+) -> List[OracleInsight]:
+    # groups: (policy, attempts, successes)
+    insights = []
+
+    for policy, attempts, successes in groups:
+        if successes == 0 and attempts >= POLICY_MIN_ATTEMPTS:
+            insights.append(
+                OracleInsight(
+                    type=InsightType.SUGGESTION,
+                    source="oracle.analyzer",
+                    description=(f"Policy '{policy}' nunca gerou ações bem-sucedidas"),
+                    confidence=0.7,
+                    metadata={
+                        "policy": policy,
+                        "attempts": attempts,
+                    },
+                )
+            )
+
+    return insights
 
 
 class OracleAnalyzer:
-    def __init__(self, history: list[OracleRecord]):
+    def __init__(
+        self, history: list[OracleRecord], rollups: Iterable[OracleRollup] = ()
+    ):
         self.history = history
+        # horas já consolidadas pela retenção (mais antigas que o histórico);
+        # entram nos detectores que só dependem de ação/resultado/confiança
+        self.rollups = list(rollups)
 
     def analyze(self) -> list[OracleInsight]:
         insights: list[OracleInsight] = []
@@ -26,130 +198,54 @@ class OracleAnalyzer:
 
         for rec in self.history:
             key = (rec.source, rec.action_type)
-            by_source_action[key].append(rec.ts)
-
-        insights = []
-
-        for (source, action), timestamps in by_source_action.items():
-            if len(timestamps) < 5:
-                continue
-
-            hours = [ts.hour + ts.minute / 60 for ts in timestamps]
-            avg_hour = mean(hours)
-            variance = max(hours) - min(hours)
-
-            if variance <= 0.5:  # ~ 30 minutos
-                insights.append(
-                    OracleInsight(
-                        type=InsightType.HABIT,
-                        source=source,
-                        description=(
-                            f"Ação {action} ocorre frequentemente "
-                            f"por volta das {int(avg_hour)}h"
-                        ),
-                        confidence=0.8,
-                        metadata={"avg_hour": avg_hour, "samples": len(hours)},
-                    )
-                )
+            by_source_action[key].append(_hour_of_day(rec.ts))
 
-        return insights
+        return _habit_insights(
+            (source, action, len(hours), min(hours), max(hours), sum(hours))
+            for (source, action), hours in by_source_action.items()
+        )
 
     def _detect_high_frequency(self) -> List[OracleInsight]:
-        insights = []
-
-        recent = [
-            r for r in self.history if r.ts >= datetime.now() - timedelta(minutes=10)
-        ]
-
-        counts = Counter((r.action_type, r.target) for r in recent)
-
-        for (action, target), count in counts.items():
-            if count >= 10:
-                insights.append(
-                    OracleInsight(
-                        type=InsightType.ANOMALY,
-                        source="oracle.analyzer",
-                        description=(
-                            f"Ação {action} para {target} "
-                            f"executada {count} vezes em poucos minutos"
-                        ),
-                        confidence=0.8,
-                        metadata={
-                            "action_type": action,
-                            "target": target,
-                            "count": count,
-                        },
-                    )
-                )
+        cutoff = datetime.now() - FREQUENCY_WINDOW
 
-        return insights
+        counts = Counter(
+            (r.action_type, r.target) for r in self.history if r.ts >= cutoff
+        )
+
+        return _frequency_insights(
+            (action, target, count) for (action, target), count in counts.items()
+        )
 
     def _detect_low_confidence(self) -> List[OracleInsight]:
-        insights = []
+        # action -> [samples, sum_confidence]
+        grouped: Dict[str, list] = {}
 
-        grouped = defaultdict(list)
+        for rollup in self.rollups:
+            aggregate = grouped.setdefault(rollup.action_type, [0, 0.0])
+            aggregate[0] += rollup.count
+            aggregate[1] += rollup.confidence_sum
 
         for r in self.history:
-            grouped[r.action_type].append(r.confidence)
-
-        for action, confidences in grouped.items():
-            if len(confidences) < 5:
-                continue
-
-            avg = sum(confidences) / len(confidences)
-
-            if avg < 0.3:
-                insights.append(
-                    OracleInsight(
-                        type=InsightType.SUGGESTION,
-                        source="oracle.analyzer",
-                        description=(
-                            f"Ação {action} apresenta confiança média baixa ({avg:.2f})"
-                        ),
-                        confidence=1 - avg,
-                        metadata={
-                            "action_type": action,
-                            "average_confidence": avg,
-                        },
-                    )
-                )
+            aggregate = grouped.setdefault(r.action_type, [0, 0.0])
+            aggregate[0] += 1
+            aggregate[1] += r.confidence
 
-        return insights
+        return _low_confidence_insights(
+            (action, samples, total) for action, (samples, total) in grouped.items()
+        )
 
     def _detect_blocked_actions(self) -> List[OracleInsight]:
-        insights = []
-
+        blocked = sum(1 for r in self.history if r.result in BLOCKED_RESULTS)
         total = len(self.history)
-        if total == 0:
-            return insights
-
-        blocked = [
-            r
-            for r in self.history
-            if r.result in (ActionResult.IGNORED, ActionResult.FAILED)
-        ]
 
-        rate = len(blocked) / total
+        for rollup in self.rollups:
+            total += rollup.count
+            if rollup.result in BLOCKED_RESULTS:
+                blocked += rollup.count
 
-        if rate >= 0.4:
-            insights.append(
-                OracleInsight(
-                    type=InsightType.ANOMALY,
-                    source="oracle.analyzer",
-                    description=(f"Alta taxa de bloqueios detectada ({rate:.0%})"),
-                    confidence=rate,
-                    metadata={
-                        "blocked": len(blocked),
-                        "total": total,
-                    },
-                )
-            )
-
-        return insights
+        return _blocked_insights(blocked, total)
 
     def _detect_unused_policies(self) -> List[OracleInsight]:
-        insights = []
-
         policies = defaultdict(list)
 
         for r in self.history:
@@ -157,23 +253,290 @@ class OracleAnalyzer:
             if policy:
                 policies[policy].append(r.result)
 
-        for policy, results in policies.items():
-            success = sum(1 for r in results if r == ActionResult.SUCCESS)
-
-            if success == 0 and len(results) >= 5:
-                insights.append(
-                    OracleInsight(
-                        type=InsightType.SUGGESTION,
-                        source="oracle.analyzer",
-                        description=(
-                            f"Policy '{policy}' nunca gerou ações bem-sucedidas"
-                        ),
-                        confidence=0.7,
-                        metadata={
-                            "policy": policy,
-                            "attempts": len(results),
-                        },
-                    )
+        return _policy_insights(
+            (
+                policy,
+                len(results),
+                sum(1 for r in results if r == ActionResult.SUCCESS),
+            )
+            for policy, results in policies.items()
+        )
+
+
+class IncrementalOracleAnalyzer:
+    """
+    Mantém os agregados dos detectores à medida que os registros chegam,
+    de forma que `analyze()` custe O(grupos) em vez de O(histórico).
+
+    Os registros devem ser adicionados em ordem de `ts` (a ordem de
+    `OracleObserver.observe` e de `OracleStorage.iter_range`).
+    """
+
+    def __init__(
+        self,
+        history: Iterable[OracleRecord] = (),
+        rollups: Iterable[OracleRollup] = (),
+    ):
+        self._lock = threading.Lock()
+
+        # (source, action) -> [samples, min_hour, max_hour, sum_hours]
+        self._habits: Dict[Tuple[str, str], list] = {}
+        # (action, target) -> timestamps dentro da janela de frequência
+        self._recent: Dict[Tuple[str, str], Deque[datetime]] = {}
+        # action -> [samples, sum_confidence]
+        self._confidence: Dict[str, list] = {}
+        # policy -> [attempts, successes]
+        self._policies: Dict[str, list] = {}
+
+        self._blocked = 0
+        self._total = 0
+
+        for rollup in rollups:
+            self.add_rollup(rollup)
+        for rec in history:
+            self.add(rec)
+
+    def add_rollup(self, rollup: OracleRollup):
+        with self._lock:
+            confidence = self._confidence.setdefault(rollup.action_type, [0, 0])
+            confidence[0] += rollup.count
+            confidence[1] += rollup.confidence_sum
+
+            self._total += rollup.count
+            if rollup.result in BLOCKED_RESULTS:
+                self._blocked += rollup.count
+
+    def add(self, rec: OracleRecord):
+        hour = _hour_of_day(rec.ts)
+
+        with self._lock:
+            habit = self._habits.get((rec.source, rec.action_type))
+            if habit is None:
+                self._habits[(rec.source, rec.action_type)] = [1, hour, hour, hour]
+            else:
+                habit[0] += 1
+                habit[1] = min(habit[1], hour)
+                habit[2] = max(habit[2], hour)
+                habit[3] += hour
+
+            cutoff = datetime.now() - FREQUENCY_WINDOW
+            if rec.ts >= cutoff:
+                key = (rec.action_type, rec.target)
+                recent = self._recent.setdefault(key, deque())
+                recent.append(rec.ts)
+                self._prune(key, cutoff)
+
+            confidence = self._confidence.setdefault(rec.action_type, [0, 0])
+            confidence[0] += 1
+            confidence[1] += rec.confidence
+
+            self._total += 1
+            if rec.result in BLOCKED_RESULTS:
+                self._blocked += 1
+
+            policy = rec.metadata.get("policy")
+            if policy:
+                outcome = self._policies.setdefault(policy, [0, 0])
+                outcome[0] += 1
+                if rec.result == ActionResult.SUCCESS:
+                    outcome[1] += 1
+
+    def _prune(self, key: Tuple[str, str], cutoff: datetime):
+        recent = self._recent[key]
+        while recent and recent[0] < cutoff:
+            recent.popleft()
+        if not recent:
+            del self._recent[key]
+
+    def analyze(self) -> list[OracleInsight]:
+        insights: list[OracleInsight] = []
+
+        with self._lock:
+            insights.extend(
+                _habit_insights(
+                    (source, action, *aggregate)
+                    for (source, action), aggregate in self._habits.items()
+                )
+            )
+
+            cutoff = datetime.now() - FREQUENCY_WINDOW
+            for key in list(self._recent):
+                self._prune(key, cutoff)
+
+            # mesma ordem do detector em lote: primeira ocorrência na janela
+            recent = sorted(self._recent.items(), key=lambda item: item[1][0])
+            insights.extend(
+                _frequency_insights(
+                    (action, target, len(timestamps))
+                    for (action, target), timestamps in recent
+                )
+            )
+
+            insights.extend(
+                _low_confidence_insights(
+                    (action, samples, total)
+                    for action, (samples, total) in self._confidence.items()
+                )
+            )
+            insights.extend(_blocked_insights(self._blocked, self._total))
+            insights.extend(
+                _policy_insights(
+                    (policy, attempts, successes)
+                    for policy, (attempts, successes) in self._policies.items()
                 )
+            )
 
         return insights
+
+
+class SqlOracleAnalyzer:
+    """
+    Executa os detectores como GROUP BY no SQLite e só constrói os insights
+    a partir das linhas agregadas: a memória usada não cresce com o histórico.
+    """
+
+    # ts em milissegundos de época; a hora do dia é a local, como no lote
+    HOUR_EXPR = (
+        "CAST(strftime('%H', ts / 1000, 'unixepoch', 'localtime') AS INTEGER)"
+        " + CAST(strftime('%M', ts / 1000, 'unixepoch', 'localtime') AS INTEGER)"
+        " / 60.0"
+    )
+
+    def __init__(
+        self,
+        db_path: Path = Path("oracle.db"),
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ):
+        self.db_path = Path(db_path)
+        self.since = since
+        self.until = until
+
+    def analyze(self) -> list[OracleInsight]:
+        insights: list[OracleInsight] = []
+
+        with sqlite3.connect(self.db_path) as conn:
+            insights.extend(self._detect_time_habits(conn))
+            insights.extend(self._detect_high_frequency(conn))
+            insights.extend(self._detect_low_confidence(conn))
+            insights.extend(self._detect_blocked_actions(conn))
+            insights.extend(self._detect_unused_policies(conn))
+
+        return insights
+
+    def _where(
+        self, since: datetime | None = None, extra: Iterable[str] = ()
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = list(extra), []
+
+        # comparados já em epoch ms: a janela pedida pode vir com fuso
+        # (ex.: ?since=...Z) e o limite interno é hora local ingênua
+        bounds = [to_epoch_ms(b) for b in (self.since, since) if b is not None]
+        if bounds:
+            clauses.append("ts >= ?")
+            params.append(max(bounds))
+        if self.until is not None:
+            clauses.append("ts < ?")
+            params.append(to_epoch_ms(self.until))
+
+        if not clauses:
+            return "", params
+        return "WHERE " + " AND ".join(clauses), params
+
+    def _detect_time_habits(self, conn: sqlite3.Connection) -> list[OracleInsight]:
+        where, params = self._where()
+        rows = conn.execute(
+            f"""
+            SELECT source, action_type, COUNT(*), MIN(h), MAX(h), SUM(h)
+            FROM (
+                SELECT id, ts, source, action_type, {self.HOUR_EXPR} AS h
+                FROM observations {where}
+            )
+            GROUP BY source, action_type
+            HAVING COUNT(*) >= ?
+            ORDER BY MIN(ts), MIN(id)
+            """,
+            (*params, HABIT_MIN_SAMPLES),
+        )
+
+        return _habit_insights(rows)
+
+    def _detect_high_frequency(self, conn: sqlite3.Connection) -> List[OracleInsight]:
+        where, params = self._where(since=datetime.now() - FREQUENCY_WINDOW)
+        rows = conn.execute(
+            f"""
+            SELECT action_type, target, COUNT(*)
+            FROM observations {where}
+            GROUP BY action_type, target
+            HAVING COUNT(*) >= ?
+            ORDER BY MIN(ts), MIN(id)
+            """,
+            (*params, FREQUENCY_MIN_COUNT),
+        )
+
+        return _frequency_insights(rows)
+
+    def _rollup_where(self) -> Tuple[str, List[Any]]:
+        return window_clause("hour", self.since, self.until)
+
+    def _detect_low_confidence(self, conn: sqlite3.Connection) -> List[OracleInsight]:
+        where, params = self._where()
+        rollup_where, rollup_params = self._rollup_where()
+        rows = conn.execute(
+            f"""
+            SELECT action_type, SUM(n), SUM(total)
+            FROM (
+                SELECT action_type, count AS n, confidence_sum AS total,
+                       hour AS ts, -1 AS id
+                FROM observation_rollups {rollup_where}
+                UNION ALL
+                SELECT action_type, 1, confidence, ts, id
+                FROM observations {where}
+            )
+            GROUP BY action_type
+            HAVING SUM(n) >= ? AND SUM(total) < ? * SUM(n)
+            ORDER BY MIN(ts), MIN(id)
+            """,
+            (
+                *rollup_params,
+                *params,
+                LOW_CONFIDENCE_MIN_SAMPLES,
+                LOW_CONFIDENCE_THRESHOLD,
+            ),
+        )
+
+        return _low_confidence_insights(rows)
+
+    def _detect_blocked_actions(self, conn: sqlite3.Connection) -> List[OracleInsight]:
+        where, params = self._where()
+        rollup_where, rollup_params = self._rollup_where()
+        total, blocked = conn.execute(
+            f"""
+            SELECT COALESCE(SUM(n), 0), COALESCE(SUM(blocked), 0)
+            FROM (
+                SELECT COUNT(*) AS n, SUM(result IN (?, ?)) AS blocked
+                FROM observations {where}
+                UNION ALL
+                SELECT SUM(count), SUM(CASE WHEN result IN (?, ?) THEN count END)
+                FROM observation_rollups {rollup_where}
+            )
+            """,
+            (*BLOCKED_RESULTS, *params, *BLOCKED_RESULTS, *rollup_params),
+        ).fetchone()
+
+        return _blocked_insights(blocked, total)
+
+    def _detect_unused_policies(self, conn: sqlite3.Connection) -> List[OracleInsight]:
+        where, params = self._where(extra=["policy IS NOT NULL"])
+        rows = conn.execute(
+            f"""
+            SELECT policy, COUNT(*), SUM(result = ?)
+            FROM observations {where}
+            GROUP BY policy
+            HAVING SUM(result = ?) = 0 AND COUNT(*) >= ?
+            ORDER BY MIN(ts), MIN(id)
+            """,
+            (ActionResult.SUCCESS, *params, ActionResult.SUCCESS, POLICY_MIN_ATTEMPTS),
+        )
+
+        return _policy_insights(rows)
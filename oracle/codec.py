@@ -0,0 +1,188 @@
+"""
+Codificação compacta do metadata das observações.
+
+Subconjunto do formato MessagePack (nil, bool, int, float, str, bytes,
+array e map): o blob gravado pode ser lido por qualquer biblioteca
+msgpack. Valores de outros tipos são gravados como texto (`str(valor)`),
+assim como inteiros fora da faixa de 64 bits do msgpack (menores que
+-2**63 ou maiores que 2**64 - 1): eles voltam como `str` na leitura. A
+gravação de uma observação nunca falha por causa do metadata.
+"""
+
+import struct
+from enum import Enum
+from typing import Any, Tuple
+
+
+def encode(value: Any) -> bytes:
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def _encode(value: Any, out: bytearray):
+    if value is None:
+        out.append(0xC0)
+    elif value is True:
+        out.append(0xC3)
+    elif value is False:
+        out.append(0xC2)
+    elif isinstance(value, Enum):
+        _encode(value.value, out)
+    elif isinstance(value, int):
+        _encode_int(value, out)
+    elif isinstance(value, float):
+        out.append(0xCB)
+        out += struct.pack(">d", value)
+    elif isinstance(value, str):
+        data = value.encode()
+        _header(len(data), out, fix=(0xA0, 31), sizes=(0xD9, 0xDA, 0xDB))
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        _header(len(value), out, fix=None, sizes=(0xC4, 0xC5, 0xC6))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        _header(len(value), out, fix=(0x90, 15), sizes=(None, 0xDC, 0xDD))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        _header(len(value), out, fix=(0x80, 15), sizes=(None, 0xDE, 0xDF))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    else:
+        _encode(str(value), out)
+
+
+_UINTS = ((0xFF, 0xCC, ">B"), (0xFFFF, 0xCD, ">H"), (0xFFFFFFFF, 0xCE, ">I"))
+_INTS = ((-(2**7), 0xD0, ">b"), (-(2**15), 0xD1, ">h"), (-(2**31), 0xD2, ">i"))
+
+
+def _encode_int(value: int, out: bytearray):
+    if 0 <= value <= 0x7F:
+        out.append(value)
+        return
+    if -32 <= value < 0:
+        out.append(value & 0xFF)
+        return
+
+    # o menor formato que comporta o valor
+    if value > 0:
+        candidates = _UINTS + ((2**64 - 1, 0xCF, ">Q"),)
+        fits = [c for c in candidates if value <= c[0]]
+    else:
+        candidates = _INTS + ((-(2**63), 0xD3, ">q"),)
+        fits = [c for c in candidates if value >= c[0]]
+
+    if not fits:
+        # fora de int64/uint64: vira texto, como os tipos sem msgpack
+        _encode(str(value), out)
+        return
+
+    _, prefix, fmt = fits[0]
+    out.append(prefix)
+    out += struct.pack(fmt, value)
+
+
+def _header(size: int, out: bytearray, fix, sizes):
+    # fix: (prefixo, tamanho máximo) do formato curto; sizes: 8/16/32 bits
+    if fix is not None and size <= fix[1]:
+        out.append(fix[0] | size)
+    elif sizes[0] is not None and size <= 0xFF:
+        out += bytes((sizes[0], size))
+    elif size <= 0xFFFF:
+        out.append(sizes[1])
+        out += struct.pack(">H", size)
+    else:
+        out.append(sizes[2])
+        out += struct.pack(">I", size)
+
+
+def decode(data: bytes | None) -> Any:
+    if not data:
+        return None
+
+    value, _ = _decode(memoryview(data), 0)
+    return value
+
+
+_FIXED = {
+    0xCC: ">B",
+    0xCD: ">H",
+    0xCE: ">I",
+    0xCF: ">Q",
+    0xD0: ">b",
+    0xD1: ">h",
+    0xD2: ">i",
+    0xD3: ">q",
+    0xCA: ">f",
+    0xCB: ">d",
+}
+
+# prefixo -> (tipo, formato do tamanho)
+_SIZED = {
+    0xD9: ("str", ">B"),
+    0xDA: ("str", ">H"),
+    0xDB: ("str", ">I"),
+    0xC4: ("bin", ">B"),
+    0xC5: ("bin", ">H"),
+    0xC6: ("bin", ">I"),
+    0xDC: ("array", ">H"),
+    0xDD: ("array", ">I"),
+    0xDE: ("map", ">H"),
+    0xDF: ("map", ">I"),
+}
+
+
+def _decode(data: memoryview, pos: int) -> Tuple[Any, int]:
+    prefix = data[pos]
+    pos += 1
+
+    if prefix <= 0x7F:
+        return prefix, pos
+    if prefix >= 0xE0:
+        return prefix - 0x100, pos
+    if 0xA0 <= prefix <= 0xBF:
+        return _sized("str", prefix & 0x1F, data, pos)
+    if 0x90 <= prefix <= 0x9F:
+        return _sized("array", prefix & 0x0F, data, pos)
+    if 0x80 <= prefix <= 0x8F:
+        return _sized("map", prefix & 0x0F, data, pos)
+    if prefix == 0xC0:
+        return None, pos
+    if prefix == 0xC2:
+        return False, pos
+    if prefix == 0xC3:
+        return True, pos
+
+    if prefix in _FIXED:
+        fmt = _FIXED[prefix]
+        end = pos + struct.calcsize(fmt)
+        return struct.unpack(fmt, data[pos:end])[0], end
+
+    if prefix in _SIZED:
+        kind, fmt = _SIZED[prefix]
+        end = pos + struct.calcsize(fmt)
+        return _sized(kind, struct.unpack(fmt, data[pos:end])[0], data, end)
+
+    raise ValueError(f"Prefixo msgpack não suportado: {prefix:#x}")
+
+
+def _sized(kind: str, size: int, data: memoryview, pos: int) -> Tuple[Any, int]:
+    if kind == "str":
+        return str(data[pos : pos + size], "utf-8"), pos + size
+    if kind == "bin":
+        return bytes(data[pos : pos + size]), pos + size
+
+    if kind == "array":
+        items = []
+        for _ in range(size):
+            item, pos = _decode(data, pos)
+            items.append(item)
+        return items, pos
+
+    mapping = {}
+    for _ in range(size):
+        key, pos = _decode(data, pos)
+        mapping[key], pos = _decode(data, pos)
+    return mapping, pos
@@ -0,0 +1,303 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from oracle.analyzer import (
+    BLOCKED_RESULTS,
+    FREQUENCY_WINDOW,
+    _blocked_insights,
+    _frequency_insights,
+    _habit_insights,
+    _low_confidence_insights,
+    _policy_insights,
+)
+from oracle.models import ActionResult, OracleInsight, OracleRollup
+from oracle.storage import (
+    HOUR_MS,
+    OracleStorage,
+    read_rollups,
+    to_epoch_ms,
+    window_clause,
+)
+
+# colunas categóricas: guardadas como códigos int32 + tabela de rótulos
+CATEGORICAL = ("source", "action_type", "target", "result", "policy")
+
+
+class ColumnarOracleAnalyzer:
+    """
+    Carrega `observations` em arrays NumPy (ts em milissegundos de época,
+    códigos categóricos e confiança float32) e roda cada detector como um
+    group-by vetorizado. Gera os mesmos insights que o OracleAnalyzer.
+
+    NumPy é dependência opcional (`pip install nexus[analysis]`).
+    """
+
+    def __init__(
+        self,
+        db_path: Path = Path("oracle.db"),
+        since: datetime | None = None,
+        until: datetime | None = None,
+        batch_size: int = 100_000,
+    ):
+        self.db_path = Path(db_path)
+        self.since = since
+        self.until = until
+        self.batch_size = batch_size
+
+        self.ts = np.empty(0, dtype=np.int64)
+        self.confidence = np.empty(0, dtype=np.float32)
+        self.codes: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, List[Any]] = {}
+        self.rollups: List[OracleRollup] = []
+
+    # ========================
+    #   CARGA
+    # ========================
+
+    def load(self) -> "ColumnarOracleAnalyzer":
+        where, params = window_clause("ts", self.since, self.until)
+
+        # sem ORDER BY: a ordenação por ts é feita depois, no NumPy
+        query = (
+            f"SELECT ts, confidence, {', '.join(CATEGORICAL)} "
+            f"FROM observations {where}"
+        )
+
+        lookups: Dict[str, Dict[Any, int]] = {name: {} for name in CATEGORICAL}
+        ts_chunks, confidence_chunks = [], []
+        code_chunks: Dict[str, list] = {name: [] for name in CATEGORICAL}
+
+        with sqlite3.connect(self.db_path) as conn:
+            # horas já consolidadas pela retenção entram pelos agregados
+            self.rollups = read_rollups(conn, self.since, self.until)
+
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+
+                ts, confidence, *categorical = zip(*rows)
+                ts_chunks.append(np.array(ts, dtype=np.int64))
+                confidence_chunks.append(
+                    np.array(confidence, dtype=np.float32)
+                    if None not in confidence
+                    else np.array(
+                        [np.nan if c is None else c for c in confidence],
+                        dtype=np.float32,
+                    )
+                )
+
+                for name, values in zip(CATEGORICAL, categorical):
+                    lookup = lookups[name]
+                    for value in set(values).difference(lookup):
+                        lookup[value] = len(lookup)
+                    code_chunks[name].append(
+                        np.fromiter(
+                            map(lookup.__getitem__, values),
+                            dtype=np.int32,
+                            count=len(values),
+                        )
+                    )
+
+        # ordena por ts mantendo a ordem de inserção nos empates
+        ts = _concat(ts_chunks, np.int64)
+        order = np.argsort(ts, kind="stable")
+
+        self.ts = ts[order]
+        self.confidence = _concat(confidence_chunks, np.float32)[order]
+        for name in CATEGORICAL:
+            self.codes[name] = _concat(code_chunks[name], np.int32)[order]
+            self.labels[name] = list(lookups[name])
+
+        # gravações antigas usam outros nomes para o resultado
+        self.labels["result"] = [
+            OracleStorage._parse_result(value) for value in self.labels["result"]
+        ]
+
+        return self
+
+    # ========================
+    #   ANÁLISE
+    # ========================
+
+    def analyze(self) -> list[OracleInsight]:
+        if not self.codes:
+            self.load()
+
+        insights: list[OracleInsight] = []
+
+        insights.extend(self._detect_time_habits())
+        insights.extend(self._detect_high_frequency())
+        insights.extend(self._detect_low_confidence())
+        insights.extend(self._detect_blocked_actions())
+        insights.extend(self._detect_unused_policies())
+
+        return insights
+
+    def _group(self, *names: str, mask: np.ndarray | None = None):
+        """
+        Agrupa as linhas pelas colunas categóricas `names`. Devolve os
+        códigos de cada grupo, o grupo de cada linha e a ordem dos grupos
+        pela primeira ocorrência (a mesma dos detectores em lote).
+        """
+        key = np.zeros(len(self.ts), dtype=np.int64)
+        for name in names:
+            key = key * max(len(self.labels[name]), 1) + self.codes[name]
+        if mask is not None:
+            key = key[mask]
+
+        groups, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind="stable")
+
+        parts = []
+        for name in reversed(names):
+            size = max(len(self.labels[name]), 1)
+            parts.append(groups % size)
+            groups = groups // size
+        parts.reverse()
+
+        return parts, inverse, order
+
+    def _detect_time_habits(self) -> list[OracleInsight]:
+        if not len(self.ts):
+            return []
+
+        hours = self._local_hours()
+        (sources, actions), inverse, order = self._group("source", "action_type")
+        n = len(sources)
+
+        samples = np.bincount(inverse, minlength=n)
+        total = np.bincount(inverse, weights=hours, minlength=n)
+        lo = np.full(n, np.inf)
+        hi = np.full(n, -np.inf)
+        np.minimum.at(lo, inverse, hours)
+        np.maximum.at(hi, inverse, hours)
+
+        return _habit_insights(
+            (
+                self.labels["source"][sources[g]],
+                self.labels["action_type"][actions[g]],
+                int(samples[g]),
+                float(lo[g]),
+                float(hi[g]),
+                float(total[g]),
+            )
+            for g in order
+        )
+
+    def _local_hours(self) -> np.ndarray:
+        # deslocamento do fuso calculado uma vez por hora distinta (o
+        # horário de verão muda de hora em hora, no máximo)
+        buckets, inverse = np.unique(self.ts // HOUR_MS, return_inverse=True)
+        offsets = np.array(
+            [
+                datetime.fromtimestamp(int(b) * 3600)
+                .astimezone()
+                .utcoffset()
+                .total_seconds()
+                for b in buckets
+            ],
+            dtype=np.int64,
+        )
+
+        local_minutes = (self.ts // 1000 + offsets[inverse]) // 60
+        return (local_minutes % (24 * 60)) / 60.0
+
+    def _detect_high_frequency(self) -> List[OracleInsight]:
+        cutoff = to_epoch_ms(datetime.now() - FREQUENCY_WINDOW)
+
+        recent = self.ts >= cutoff
+        if not recent.any():
+            return []
+
+        (actions, targets), inverse, order = self._group(
+            "action_type", "target", mask=recent
+        )
+        counts = np.bincount(inverse, minlength=len(actions))
+
+        return _frequency_insights(
+            (
+                self.labels["action_type"][actions[g]],
+                self.labels["target"][targets[g]],
+                int(counts[g]),
+            )
+            for g in order
+        )
+
+    def _detect_low_confidence(self) -> List[OracleInsight]:
+        # action -> [samples, sum_confidence]; horas consolidadas vêm antes
+        grouped: Dict[str, list] = {}
+        for rollup in self.rollups:
+            aggregate = grouped.setdefault(rollup.action_type, [0, 0.0])
+            aggregate[0] += rollup.count
+            aggregate[1] += rollup.confidence_sum
+
+        if len(self.ts):
+            (actions,), inverse, order = self._group("action_type")
+            n = len(actions)
+
+            samples = np.bincount(inverse, minlength=n)
+            total = np.bincount(
+                inverse, weights=self.confidence.astype(np.float64), minlength=n
+            )
+
+            for g in order:
+                action = self.labels["action_type"][actions[g]]
+                aggregate = grouped.setdefault(action, [0, 0.0])
+                aggregate[0] += int(samples[g])
+                aggregate[1] += float(total[g])
+
+        return _low_confidence_insights(
+            (action, samples, total) for action, (samples, total) in grouped.items()
+        )
+
+    def _detect_blocked_actions(self) -> List[OracleInsight]:
+        blocked_codes = [
+            code
+            for code, result in enumerate(self.labels.get("result", []))
+            if result in BLOCKED_RESULTS
+        ]
+        blocked = int(np.isin(self.codes["result"], blocked_codes).sum())
+        total = len(self.ts)
+
+        for rollup in self.rollups:
+            total += rollup.count
+            if rollup.result in BLOCKED_RESULTS:
+                blocked += rollup.count
+
+        return _blocked_insights(blocked, total)
+
+    def _detect_unused_policies(self) -> List[OracleInsight]:
+        # usa a coluna `policy` extraída, sem decodificar o metadata
+        labels = self.labels.get("policy", [])
+        if None in labels:
+            with_policy = self.codes["policy"] != labels.index(None)
+        else:
+            with_policy = np.ones(len(self.ts), dtype=bool)
+        if not with_policy.any():
+            return []
+
+        success_codes = [
+            code
+            for code, result in enumerate(self.labels["result"])
+            if result == ActionResult.SUCCESS
+        ]
+        succeeded = np.isin(self.codes["result"], success_codes)[with_policy]
+
+        (policies,), inverse, order = self._group("policy", mask=with_policy)
+        n = len(policies)
+        attempts = np.bincount(inverse, minlength=n)
+        successes = np.bincount(inverse, weights=succeeded, minlength=n)
+
+        return _policy_insights(
+            (labels[policies[g]], int(attempts[g]), int(successes[g])) for g in order
+        )
+
+
+def _concat(chunks: list, dtype) -> np.ndarray:
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
@@ -1,38 +1,116 @@
 import sqlite3
+import threading
+import time
 from collections import Counter
 from pathlib import Path
+from typing import Any, Dict
 
 from oracle.models import ActionResult
 
+# totais por action_type das horas consolidadas (mesmas colunas da varredura)
+ROLLUP_TOTALS = """
+    SELECT
+        action_type,
+        SUM(count) AS n,
+        SUM(CASE WHEN result = ? THEN count ELSE 0 END) AS ok,
+        SUM(confidence_count) AS rated,
+        SUM(confidence_sum) AS total
+    FROM observation_rollups
+"""
+
 
 class OracleMetrics:
-    def __init__(self, db_path: Path = Path("oracle.db")):
+    def __init__(self, db_path: Path = Path("oracle.db"), ttl: float | None = None):
         self.db_path = db_path
+        # ttl=None desliga o cache; invalidate() descarta o snapshot atual
+        self.ttl = ttl
 
-    def success_rate(self) -> float:
-        with sqlite3.connect(self.db_path) as conn:
-            total = conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+        self._lock = threading.Lock()
+        self._cached: Dict[str, Any] | None = None
+        self._cached_at = 0.0
 
-            if total == 0:
-                return 0.0
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Todas as métricas em uma única varredura (agregação condicional
+        agrupada por action_type), opcionalmente servidas do cache. Horas
+        já consolidadas pela retenção vêm de `observation_rollups`.
+        """
+        if self.ttl is not None:
+            with self._lock:
+                if (
+                    self._cached is not None
+                    and time.monotonic() - self._cached_at < self.ttl
+                ):
+                    return self._cached
 
-            success = conn.execute(
-                "SELECT COUNT(*) FROM observations WHERE result = ?",
-                (ActionResult.SUCCESS,),
-            ).fetchone()[0]
+        snapshot = self._scan()
 
-            return success / total
+        if self.ttl is not None:
+            with self._lock:
+                self._cached = snapshot
+                self._cached_at = time.monotonic()
 
-    def actions_count(self):
+        return snapshot
+
+    def _scan(self) -> Dict[str, Any]:
         with sqlite3.connect(self.db_path) as conn:
             rows = conn.execute(
-                "SELECT action_type, COUNT(*) FROM observations GROUP BY action_type"
+                f"""
+                SELECT action_type, SUM(n), SUM(ok), SUM(rated), SUM(total)
+                FROM (
+                    SELECT
+                        action_type,
+                        COUNT(*) AS n,
+                        SUM(result = ?) AS ok,
+                        COUNT(confidence) AS rated,
+                        SUM(confidence) AS total
+                    FROM observations
+                    GROUP BY action_type
+                    UNION ALL
+                    {ROLLUP_TOTALS}
+                    GROUP BY action_type
+                )
+                GROUP BY action_type
+                """,
+                (ActionResult.SUCCESS, ActionResult.SUCCESS),
             ).fetchall()
 
-        return Counter(dict(rows))
+        total = sum(row[1] for row in rows)
+        success = sum(row[2] for row in rows)
+        rated = sum(row[3] for row in rows)
+        confidence = sum(row[4] or 0.0 for row in rows)
 
-    def average_confidence(self) -> float:
+        return {
+            "success_rate": success / total if total else 0.0,
+            "average_confidence": confidence / rated if rated else 0.0,
+            "actions_count": Counter({row[0]: row[1] for row in rows}),
+        }
+
+    def invalidate(self):
+        with self._lock:
+            self._cached = None
+
+    def success_rate(self) -> float:
         with sqlite3.connect(self.db_path) as conn:
-            avg = conn.execute("SELECT AVG(confidence) FROM observations").fetchone()[0]
+            total, success = conn.execute(
+                f"""
+                SELECT COALESCE(SUM(n), 0), COALESCE(SUM(ok), 0)
+                FROM (
+                    SELECT COUNT(*) AS n, SUM(result = ?) AS ok FROM observations
+                    UNION ALL
+                    SELECT SUM(n), SUM(ok) FROM ({ROLLUP_TOTALS})
+                )
+                """,
+                (ActionResult.SUCCESS, ActionResult.SUCCESS),
+            ).fetchone()
+
+        if total == 0:
+            return 0.0
+
+        return success / total
 
-        return avg or 0.0
+    def actions_count(self):
+        return self._scan()["actions_count"]
+
+    def average_confidence(self) -> float:
+        return self._scan()["average_confidence"]
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, NamedTuple
 
 
 class ActionResult(str, Enum):
@@ -10,6 +10,18 @@ class ActionResult(str, Enum):
 
 
 class OracleRecord:
+    __slots__ = (
+        "ts",
+        "event_type",
+        "source",
+        "action_type",
+        "target",
+        "confidence",
+        "priority",
+        "result",
+        "_metadata",
+    )
+
     def __init__(
         self,
         ts: datetime,
@@ -30,7 +42,29 @@ class OracleRecord:
         self.confidence = confidence
         self.priority = priority
         self.result = result
-        self.metadata = metadata or {}
+        # a maioria dos registros não tem metadata: o dict só nasce se usado
+        self._metadata = metadata or None
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]):
+        self._metadata = value
+
+
+class OracleRollup(NamedTuple):
+    """Agregado de uma hora de observações já descartadas pela retenção."""
+
+    hour: datetime
+    action_type: str
+    result: ActionResult
+    count: int
+    confidence_count: int
+    confidence_sum: float
 
 
 class InsightType(str, Enum):
@@ -40,6 +74,16 @@ class InsightType(str, Enum):
 
 
 class OracleInsight:
+    __slots__ = (
+        "ts",
+        "type",
+        "source",
+        "description",
+        "confidence",
+        "severity",
+        "metadata",
+    )
+
     def __init__(
         self,
         type: InsightType,
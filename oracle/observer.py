@@ -1,14 +1,19 @@
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Iterable
 
 from cortex.contracts import Action, Event
 from oracle.models import ActionResult, OracleRecord
 from oracle.storage import OracleStorage
+from telemetry.log import get_logger
+
+LOG = get_logger("oracle.observer")
 
 
 class OracleObserver:
-    def __init__(self, storage: OracleStorage):
+    def __init__(self, storage: OracleStorage, analyzer=None):
         self.storage = storage
+        # IncrementalOracleAnalyzer opcional, alimentado a cada observação
+        self.analyzer = analyzer
 
     def observe(
         self,
@@ -17,7 +22,34 @@ class OracleObserver:
         result: ActionResult,
         metadata: Dict[str, Any] | None = None,
     ):
-        record = OracleRecord(
+        record = self._record(event, action, result, metadata)
+
+        self.storage.save(record)
+        if self.analyzer is not None:
+            self.analyzer.add(record)
+        self._log(record)
+
+    def observe_many(self, observations: Iterable[Dict[str, Any]]):
+        """
+        Registra um lote de observações (kwargs de `observe`) em uma única
+        transação.
+        """
+        records = [self._record(**obs) for obs in observations]
+
+        self.storage.save_many(records)
+        for record in records:
+            if self.analyzer is not None:
+                self.analyzer.add(record)
+            self._log(record)
+
+    @staticmethod
+    def _record(
+        event: Event,
+        action: Action,
+        result: ActionResult,
+        metadata: Dict[str, Any] | None = None,
+    ) -> OracleRecord:
+        return OracleRecord(
             ts=datetime.now(),
             event_type=event.type,
             source=event.source,
@@ -29,12 +61,10 @@ class OracleObserver:
             metadata=metadata,
         )
 
-        self.storage.save(record)
-        self._log(record)
-
     def _log(self, record: OracleRecord):
-        print(
-            f"[ORACLE] action={record.action_type} "
-            f"result={record.result} "
-            f"confidence={record.confidence}"
+        LOG.debug(
+            "observação registrada",
+            action=record.action_type,
+            result=record.result,
+            confidence=record.confidence,
         )
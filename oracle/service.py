@@ -1,27 +1,97 @@
-from oracle.analyzer import OracleAnalyzer
+from datetime import datetime
+
+from oracle.analyzer import (
+    IncrementalOracleAnalyzer,
+    OracleAnalyzer,
+    SqlOracleAnalyzer,
+)
 from oracle.feedback import FeedbackAction, OracleFeedback
 from oracle.metrics import OracleMetrics
 from oracle.observer import OracleObserver
 from oracle.storage import OracleStorage
 
+# colunas que os detectores do OracleAnalyzer realmente leem; `policy` vem
+# da coluna indexada, sem decodificar o metadata
+ANALYZER_COLUMNS = (
+    "ts",
+    "source",
+    "action_type",
+    "target",
+    "confidence",
+    "result",
+    "policy",
+)
+
+# batch: relê o histórico a cada análise
+# incremental: agregados mantidos a cada observação
+# sql: agregações feitas pelo SQLite (GROUP BY)
+# columnar: group-bys vetorizados sobre arrays NumPy (dependência opcional)
+ANALYZER_MODES = ("batch", "incremental", "sql", "columnar")
+
 
 class OracleService:
-    def __init__(self):
-        self.storage = OracleStorage()
-        self.observer = OracleObserver(self.storage)
+    def __init__(
+        self,
+        storage: OracleStorage | None = None,
+        analyzer_mode: str = "batch",
+        metrics_ttl: float | None = None,
+        invalidate_metrics_on_write: bool = False,
+    ):
+        if analyzer_mode not in ANALYZER_MODES:
+            raise ValueError(f"Modo de análise desconhecido: {analyzer_mode}")
+
+        self.storage = storage or OracleStorage()
+        self.analyzer_mode = analyzer_mode
+
+        self.incremental: IncrementalOracleAnalyzer | None = None
+        if analyzer_mode == "incremental":
+            self.incremental = IncrementalOracleAnalyzer(
+                self.storage.iter_range(columns=ANALYZER_COLUMNS),
+                self.storage.load_rollups(),
+            )
+
+        self.observer = OracleObserver(self.storage, self.incremental)
+
+        self._metrics = OracleMetrics(self.storage.db_path, ttl=metrics_ttl)
+        self.invalidate_metrics_on_write = invalidate_metrics_on_write
 
     def observe(self, *args, **kwargs):
         self.observer.observe(*args, **kwargs)
+        if self.invalidate_metrics_on_write:
+            self._metrics.invalidate()
 
-    def analyze(self):
-        history = self.storage.load()
-        analyzer = OracleAnalyzer(history)
+    def observe_many(self, observations):
+        self.observer.observe_many(observations)
+        if self.invalidate_metrics_on_write:
+            self._metrics.invalidate()
+
+    def analyze(self, since: datetime | None = None, until: datetime | None = None):
+        # janelas arbitrárias ainda exigem a leitura do histórico
+        if self.incremental is not None and since is None and until is None:
+            return self.incremental.analyze()
+
+        if self.analyzer_mode == "sql":
+            self.storage.flush()
+            return SqlOracleAnalyzer(self.storage.db_path, since, until).analyze()
+
+        if self.analyzer_mode == "columnar":
+            from oracle.columnar import ColumnarOracleAnalyzer
+
+            self.storage.flush()
+            return ColumnarOracleAnalyzer(self.storage.db_path, since, until).analyze()
+
+        history = self.storage.load_range(since, until, columns=ANALYZER_COLUMNS)
+        analyzer = OracleAnalyzer(history, self.storage.load_rollups(since, until))
         return analyzer.analyze()
 
-    def feedback(self):
-        insights = self.analyze()
+    def feedback(self, since: datetime | None = None, until: datetime | None = None):
+        insights = self.analyze(since, until)
         feedback_procesor = OracleFeedback(insights)
         return feedback_procesor.process()
 
     def metrics(self):
-        return OracleMetrics(self.storage.db_path)
+        self.storage.flush()
+        return self._metrics
+
+    def close(self):
+        self.storage.close()
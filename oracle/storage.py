@@ -1,86 +1,566 @@
+import atexit
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Sequence
 
-from oracle.models import OracleRecord
-from oracle.observer import ActionResult
+from oracle import codec
+from oracle.models import ActionResult, OracleRecord, OracleRollup
+from telemetry.log import get_logger
+
+LOG = get_logger("oracle.storage")
+
+RECORD_COLUMNS = (
+    "ts",
+    "event_type",
+    "source",
+    "action_type",
+    "target",
+    "confidence",
+    "priority",
+    "result",
+    "metadata",
+)
+
+# `policy` é extraída do metadata e indexada: filtrável sem decodificar o blob
+STORED_COLUMNS = RECORD_COLUMNS + ("policy",)
+
+# colunas acrescentadas depois da criação das primeiras partições
+ADDED_COLUMNS = {"metadata": "BLOB", "policy": "TEXT"}
+
+INSERT_OBSERVATION = """
+    INSERT INTO {table} (
+        ts, event_type, source, action_type,
+        target, confidence, priority, result, metadata, policy
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# criados em cada partição diária: idx_observations_<dia>_<sufixo>
+INDEXES = {
+    "ts": "ts",
+    "source_action": "source, action_type",
+    "action_target": "action_type, target",
+    "result": "result",
+    "policy": "policy",
+}
+
+PARTITION_PREFIX = "observations_"
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+
+
+def to_epoch_ms(ts: datetime) -> int:
+    # datetimes ingênuos são hora local, como os gerados por datetime.now()
+    return int(ts.timestamp() * 1000)
+
+
+def from_epoch_ms(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000)
+
+
+def partition_name(ms: int) -> str:
+    # partições por dia UTC: o nome não depende do fuso da máquina
+    return PARTITION_PREFIX + time.strftime("%Y%m%d", time.gmtime(ms // 1000))
+
+
+def read_rollups(
+    conn: sqlite3.Connection,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> List[OracleRollup]:
+    """Agregados horários das partições já descartadas, em ordem de hora."""
+    where, params = window_clause("hour", since, until)
+    rows = conn.execute(
+        f"""
+        SELECT hour, action_type, result, count, confidence_count, confidence_sum
+        FROM observation_rollups {where}
+        ORDER BY hour ASC, action_type, result
+        """,
+        params,
+    ).fetchall()
+
+    return [
+        OracleRollup(
+            from_epoch_ms(hour),
+            action_type,
+            OracleStorage._parse_result(result),
+            count,
+            confidence_count,
+            confidence_sum or 0.0,
+        )
+        for hour, action_type, result, count, confidence_count, confidence_sum in rows
+    ]
+
+
+def _policy_of(metadata: Dict | None) -> str | None:
+    policy = metadata.get("policy") if metadata else None
+    return policy if isinstance(policy, str) else None
+
+
+def window_clause(column: str, since: datetime | None, until: datetime | None):
+    where, params = [], []
+    if since is not None:
+        where.append(f"{column} >= ?")
+        params.append(to_epoch_ms(since))
+    if until is not None:
+        where.append(f"{column} < ?")
+        params.append(to_epoch_ms(until))
+
+    return ("WHERE " + " AND ".join(where) if where else ""), params
 
 
 class OracleStorage:
-    def __init__(self, path: Path = Path("oracle.db")):
+    """
+    Persistência das observações do Oracle em SQLite.
+
+    Mantém uma única conexão de longa duração (modo WAL). Com
+    `write_behind=True`, `save` apenas enfileira o registro e uma thread
+    em segundo plano grava os lotes com `executemany`, quando a fila
+    atinge `batch_size` ou a cada `flush_interval` segundos. Se a fila
+    passar de `max_pending` (ex.: o banco está falhando), `save` volta a
+    gravar direto e o erro chega a quem chamou.
+
+    As observações ficam em uma tabela por dia (`observations_AAAAMMDD`,
+    ts em milissegundos de época) e a view `observations` une todas. Com
+    `retention_days`, partições mais antigas viram agregados horários em
+    `observation_rollups` e são descartadas.
+    """
+
+    def __init__(
+        self,
+        path: Path = Path("oracle.db"),
+        *,
+        write_behind: bool = False,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        synchronous: str = "NORMAL",
+        retention_days: int | None = None,
+        max_pending: int = 65_536,
+    ):
         self.db_path = Path(path)
+        self.retention_days = retention_days
+        self.write_behind = write_behind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.synchronous = synchronous
+        self.max_pending = max_pending
+        self.write_errors = 0
+
+        self._conn: sqlite3.Connection | None = None
+        self._db_lock = threading.RLock()
+        self._partitions: set[str] = set()
+
+        self._pending: List[OracleRecord] = []
+        self._pending_cond = threading.Condition()
+        self._writer: threading.Thread | None = None
+        self._closed = False
+
         self._init_db()
 
+        if write_behind:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="oracle-writer", daemon=True
+            )
+            self._writer.start()
+            atexit.register(self.close)
+
+    # ========================
+    #   CONEXÃO
+    # ========================
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        return conn
+
+    @contextmanager
+    def _connection(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        with self._db_lock:
+            if self._conn is None:
+                self._conn = self._open()
+            with self._conn:
+                # o sqlite3 só abre transação antes de DML: com `immediate`,
+                # DDL (partições, view) e escrita ficam numa transação só,
+                # serializada com os outros processos que usam o banco
+                if immediate and not self._conn.in_transaction:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                yield self._conn
+
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._db_lock:
+            # reabre a conexão: o arquivo pode ter sido removido (ex.: testes)
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+            with self._connection(immediate=True) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS observation_rollups (
+                        hour INTEGER,
+                        action_type TEXT,
+                        result TEXT,
+                        count INTEGER,
+                        confidence_count INTEGER,
+                        confidence_sum REAL,
+                        PRIMARY KEY (hour, action_type, result)
+                    )
+                    """)
+
+                legacy = conn.execute(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'table' AND name = 'observations'"
+                ).fetchone()
+                if legacy:
+                    self._migrate_legacy(conn)
+
+                for table in self._list_partitions(conn):
+                    self._create_partition(conn, table)
+                self._rebuild_view(conn)
+
+            self.apply_retention()
+
+    # ========================
+    #   PARTIÇÕES
+    # ========================
+
+    @staticmethod
+    def _list_partitions(conn: sqlite3.Connection) -> List[str]:
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? "
+            "ORDER BY name",
+            (PARTITION_PREFIX + "[0-9]*",),
+        )
+        return [row[0] for row in rows]
+
+    def _create_partition(self, conn: sqlite3.Connection, table: str):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY,
+                ts INTEGER,
+                event_type TEXT,
+                source TEXT,
+                action_type TEXT,
+                target TEXT,
+                confidence REAL,
+                priority INTEGER,
+                result TEXT,
+                metadata BLOB,
+                policy TEXT
+            )
+            """)
+
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column, kind in ADDED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+        for suffix, columns in INDEXES.items():
             conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS observations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ts TEXT,
-                    event_type TEXT,
-                    source TEXT,
-                    action_type TEXT,
-                    target TEXT,
-                    confidence REAL,
-                    priority INTEGER,
-                    result TEXT
-                )
-                """
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_{suffix} ON {table} ({columns})"
+            )
+
+    def _rebuild_view(self, conn: sqlite3.Connection):
+        # lê as partições do banco: outro processo pode ter criado alguma
+        partitions = self._list_partitions(conn)
+        self._partitions = set(partitions)
+
+        if partitions:
+            body = " UNION ALL ".join(
+                f"SELECT id, {', '.join(STORED_COLUMNS)} FROM {table}"
+                for table in partitions
+            )
+        else:
+            body = (
+                "SELECT NULL AS id, "
+                + ", ".join(f"NULL AS {column}" for column in STORED_COLUMNS)
+                + " WHERE 0"
             )
 
+        # só troca a view quando o conjunto de partições mudou: abrir o
+        # banco não reescreve o schema
+        create = f"CREATE VIEW observations AS {body}"
+        current = conn.execute(
+            "SELECT sql FROM sqlite_master "
+            "WHERE type = 'view' AND name = 'observations'"
+        ).fetchone()
+        if current is None or current[0] != create:
+            conn.execute("DROP VIEW IF EXISTS observations")
+            conn.execute(create)
+
+    def _migrate_legacy(self, conn: sqlite3.Connection):
+        """Move a antiga tabela única (ts ISO em texto) para as partições."""
+        rows = conn.execute(
+            "SELECT ts, event_type, source, action_type, target, confidence, "
+            "priority, result FROM observations ORDER BY id"
+        ).fetchall()
+
+        by_table: Dict[str, list] = {}
+        for row in rows:
+            ms = to_epoch_ms(datetime.fromisoformat(row[0]))
+            # "IGNORED"/"BLOCKED" antigos viram o valor atual: os modos SQL
+            # e as métricas comparam o texto gravado
+            result = self._parse_result(row[7]).value
+            by_table.setdefault(partition_name(ms), []).append(
+                (ms, *row[1:7], result, None, None)
+            )
+
+        for table, values in by_table.items():
+            self._create_partition(conn, table)
+            conn.executemany(INSERT_OBSERVATION.format(table=table), values)
+
+        conn.execute("DROP TABLE observations")
+
+    def apply_retention(self, now: datetime | None = None) -> int:
+        """
+        Consolida em agregados horários e descarta as partições com mais de
+        `retention_days` dias. Devolve quantas partições foram descartadas.
+        """
+        if self.retention_days is None:
+            return 0
+
+        now_ms = to_epoch_ms(now or datetime.now())
+        oldest_kept = partition_name(now_ms - self.retention_days * DAY_MS)
+
+        with self._connection(immediate=True) as conn:
+            expired = [t for t in self._list_partitions(conn) if t < oldest_kept]
+
+            for table in expired:
+                conn.execute(f"""
+                    INSERT INTO observation_rollups (
+                        hour, action_type, result,
+                        count, confidence_count, confidence_sum
+                    )
+                    SELECT ts / {HOUR_MS} * {HOUR_MS}, action_type, result,
+                           COUNT(*), COUNT(confidence), SUM(confidence)
+                    FROM {table}
+                    GROUP BY 1, 2, 3
+                    ON CONFLICT (hour, action_type, result) DO UPDATE SET
+                        count = count + excluded.count,
+                        confidence_count = confidence_count + excluded.confidence_count,
+                        confidence_sum = coalesce(confidence_sum, 0)
+                            + coalesce(excluded.confidence_sum, 0)
+                    """)
+                conn.execute(f"DROP TABLE {table}")
+
+            if expired:
+                self._rebuild_view(conn)
+
+        return len(expired)
+
+    def load_rollups(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> List[OracleRollup]:
+        with self._connection() as conn:
+            return read_rollups(conn, since, until)
+
+    # ========================
+    #   ESCRITA
+    # ========================
+
+    @staticmethod
+    def _to_row(rec: OracleRecord) -> tuple:
+        return (
+            to_epoch_ms(rec.ts),
+            rec.event_type,
+            rec.source,
+            rec.action_type,
+            rec.target,
+            rec.confidence,
+            rec.priority,
+            rec.result,
+            codec.encode(rec.metadata) if rec.metadata else None,
+            _policy_of(rec.metadata),
+        )
+
+    def _write(self, recs: List[OracleRecord]):
+        if not recs:
+            return
+
+        by_table: Dict[str, List[tuple]] = {}
+        for rec in recs:
+            row = self._to_row(rec)
+            by_table.setdefault(partition_name(row[0]), []).append(row)
+
+        new_day = False
+        with self._connection(immediate=True) as conn:
+            for table, rows in by_table.items():
+                if table not in self._partitions:
+                    self._create_partition(conn, table)
+                    self._rebuild_view(conn)
+                    new_day = True
+                conn.executemany(INSERT_OBSERVATION.format(table=table), rows)
+
+        # a virada do dia é o momento natural de aplicar a retenção
+        if new_day:
+            self.apply_retention()
+
     def save(self, rec: OracleRecord):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                INSERT INTO observations (
-                    ts, event_type, source, action_type,
-                    target, confidence, priority, result
+        self.save_many([rec])
+
+    def save_many(self, recs: List[OracleRecord]):
+        recs = list(recs)
+
+        if self.write_behind:
+            # checado sob o lock: um close() concorrente não perde o registro
+            with self._pending_cond:
+                queued = not self._closed and len(self._pending) < self.max_pending
+                if queued:
+                    self._pending.extend(recs)
+                    if len(self._pending) >= self.batch_size:
+                        self._pending_cond.notify()
+            if queued:
+                return
+
+        self._write(recs)
+
+    def _take_pending(self) -> List[OracleRecord]:
+        with self._pending_cond:
+            batch, self._pending = self._pending, []
+        return batch
+
+    def _writer_loop(self):
+        while True:
+            with self._pending_cond:
+                self._pending_cond.wait_for(
+                    lambda: self._closed or len(self._pending) >= self.batch_size,
+                    timeout=self.flush_interval,
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    rec.ts.isoformat(),
-                    rec.event_type,
-                    rec.source,
-                    rec.action_type,
-                    rec.target,
-                    rec.confidence,
-                    rec.priority,
-                    rec.result,
-                ),
-            )
+                closed = self._closed
+
+            batch = self._take_pending()
+            try:
+                self._write(batch)
+            except Exception as exc:
+                # devolve o lote para a próxima tentativa; a thread continua
+                self.write_errors += 1
+                LOG.error("falha ao gravar lote", exc, records=len(batch))
+                with self._pending_cond:
+                    self._pending[:0] = batch
+                    if not closed:
+                        self._pending_cond.wait_for(
+                            lambda: self._closed, timeout=self.flush_interval
+                        )
+
+            if closed:
+                return
+
+    def flush(self):
+        self._write(self._take_pending())
+
+    def close(self):
+        if self._closed:
+            return
+
+        with self._pending_cond:
+            self._closed = True
+            self._pending_cond.notify()
+
+        if self._writer is not None:
+            self._writer.join()
+            atexit.unregister(self.close)
+
+        self.flush()
+
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ========================
+    #   LEITURA
+    # ========================
+
+    @staticmethod
+    def _parse_result(value: str) -> ActionResult:
+        try:
+            return ActionResult(value)
+        except ValueError:
+            # versões antigas do runtime gravavam "IGNORED" / "BLOCKED"
+            return ActionResult.__members__.get(value, ActionResult.IGNORED)
+
+    @classmethod
+    def _to_record(cls, columns: Sequence[str], row: tuple) -> OracleRecord:
+        values = dict.fromkeys(STORED_COLUMNS)
+        values.update(zip(columns, row))
+        policy = values.pop("policy")
+
+        if values["ts"] is not None:
+            values["ts"] = from_epoch_ms(values["ts"])
+        if values["result"] is not None:
+            values["result"] = cls._parse_result(values["result"])
+
+        if values["metadata"] is not None:
+            values["metadata"] = codec.decode(values["metadata"])
+        elif policy is not None:
+            # só a coluna indexada foi lida: evita decodificar o blob
+            values["metadata"] = {"policy": policy}
+
+        return OracleRecord(**values)
 
     def load(self, limit: int | None = None) -> List[OracleRecord]:
-        query = """
-                SELECT
-                    ts, event_type, source, action_type,
-                    target, confidence, priority, result
+        self.flush()
+
+        query = f"""
+                SELECT {', '.join(RECORD_COLUMNS)}
                 FROM observations
-                ORDER BY ts ASC
+                ORDER BY ts ASC, id ASC
             """
 
         if limit:
             query += f" LIMIT {limit}"
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             rows = conn.execute(query).fetchall()
 
-        recs: List[OracleRecord] = []
+        return [self._to_record(RECORD_COLUMNS, row) for row in rows]
 
-        for row in rows:
-            recs.append(
-                OracleRecord(
-                    ts=datetime.fromisoformat(row[0]),
-                    event_type=row[1],
-                    source=row[2],
-                    action_type=row[3],
-                    target=row[4],
-                    confidence=row[5],
-                    priority=row[6],
-                    result=ActionResult(row[7]),
-                )
-            )
+    def iter_range(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        columns: Iterable[str] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[OracleRecord]:
+        """
+        Percorre as observações em `[since, until)` ordenadas por `ts`,
+        lendo apenas `columns` (as demais ficam como None no registro).
+        Pedir `policy` sem `metadata` preenche só `metadata["policy"]`.
+        """
+        columns = tuple(columns or RECORD_COLUMNS)
+        unknown = set(columns) - set(STORED_COLUMNS)
+        if unknown:
+            raise ValueError(f"Colunas desconhecidas: {sorted(unknown)}")
+
+        self.flush()
+
+        where, params = window_clause("ts", since, until)
+        query = (
+            f"SELECT {', '.join(columns)} FROM observations {where} "
+            "ORDER BY ts ASC, id ASC"
+        )
+
+        # cursor próprio: não segura o lock da conexão entre os lotes
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._to_record(columns, row)
+        finally:
+            conn.close()
 
-        return recs
+    def load_range(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        columns: Iterable[str] | None = None,
+    ) -> List[OracleRecord]:
+        return list(self.iter_range(since, until, columns))
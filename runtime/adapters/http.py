@@ -1,4 +1,7 @@
 from runtime.adapters.base import RuntimeAdapter
+from telemetry.log import get_logger
+
+LOG = get_logger("runtime.adapters.http")
 
 
 class HttpAdapter(RuntimeAdapter):
@@ -6,4 +9,5 @@ class HttpAdapter(RuntimeAdapter):
 
     def send(self, action):
         # placeholder — no futuro FastAPI / WebSocket
-        print(f"[HTTP OUT] {action.model_dump()}")
+        if LOG.enabled("DEBUG"):  # evita o model_dump quando desligado
+            LOG.debug("saída http", action=action.model_dump())
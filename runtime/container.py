@@ -0,0 +1,89 @@
+import threading
+from functools import cached_property
+from typing import TYPE_CHECKING, Optional
+
+# os módulos dos componentes só são importados quando o componente é
+# criado: importar o container (e os entry points) fica barato
+if TYPE_CHECKING:
+    from cortex.decision import DecisionEngine
+    from cortex.state import GlobalState, SessionManager
+    from cortex.tasks import BackgroundTasks
+    from memory.store import MemoryStore
+    from oracle.service import OracleService
+    from runtime.router import Router
+    from telemetry.metrics import StageMetrics
+
+
+class Container:
+    """
+    Componentes compartilhados do processo, criados só no primeiro acesso.
+    NexusContext, NexusRuntime, cortex.core e as streams leem daqui, então
+    existe um único SessionManager, um MemoryStore e um OracleService (um
+    único `_init_db`) por container.
+    """
+
+    @cached_property
+    def sessions(self) -> "SessionManager":
+        from cortex.state import SessionManager
+
+        return SessionManager()
+
+    @cached_property
+    def memory(self) -> "MemoryStore":
+        from memory.store import MemoryStore
+
+        return MemoryStore()
+
+    @cached_property
+    def oracle(self) -> "OracleService":
+        from oracle.service import OracleService
+        from oracle.storage import OracleStorage
+
+        # `observe` só enfileira; a thread de escrita grava em lotes, então
+        # os caminhos assíncronos observam direto, sem uma thread por evento
+        return OracleService(OracleStorage(write_behind=True))
+
+    @cached_property
+    def global_state(self) -> "GlobalState":
+        from cortex.state import GlobalState
+
+        return GlobalState()
+
+    @cached_property
+    def background(self) -> "BackgroundTasks":
+        from cortex.tasks import BackgroundTasks
+
+        return BackgroundTasks()
+
+    @cached_property
+    def decision_engine(self) -> "DecisionEngine":
+        from cortex.decision import DecisionEngine
+
+        return DecisionEngine(self.sessions)
+
+    @cached_property
+    def router(self) -> "Router":
+        from runtime.router import Router
+
+        return Router(self.decision_engine)
+
+    @cached_property
+    def metrics(self) -> "StageMetrics":
+        from telemetry.metrics import default_stage_metrics
+
+        return default_stage_metrics()
+
+
+_CONTAINER: Optional[Container] = None
+_LOCK = threading.Lock()
+
+
+def container() -> Container:
+    """Container padrão do processo."""
+    global _CONTAINER
+
+    if _CONTAINER is None:
+        with _LOCK:
+            if _CONTAINER is None:
+                _CONTAINER = Container()
+    return _CONTAINER
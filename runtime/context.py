@@ -1,22 +1,37 @@
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 
 from cortex.contracts import ConversationEvent
-from cortex.state import SessionManager
-from memory.store import MemoryStore
-from oracle.service import OracleService
+from runtime.container import Container, container
+
+# só para as anotações: os módulos são importados pelo container
+if TYPE_CHECKING:
+    from cortex.state import SessionManager
+    from memory.store import MemoryStore
+    from oracle.service import OracleService
 
 
 class NexusContext:
-    def __init__(self):
-        self.session_manager = SessionManager()
-        self.memory = MemoryStore()
-        self.oracle = OracleService()
+    def __init__(self, services: Container | None = None):
+        # componentes compartilhados, criados sob demanda
+        self.services = services or container()
 
         # registry
         self.adapters: Dict[str, object] = {}
         self.agents: Dict[str, object] = {}
         self.models: Dict[str, object] = {}
 
+    @property
+    def session_manager(self) -> "SessionManager":
+        return self.services.sessions
+
+    @property
+    def memory(self) -> "MemoryStore":
+        return self.services.memory
+
+    @property
+    def oracle(self) -> "OracleService":
+        return self.services.oracle
+
     def register_adapter(self, name: str, adapter):
         self.adapters[name] = adapter
 
@@ -36,12 +51,10 @@ class NexusContext:
         agent_hint: str | None = None,
         metadata: dict | None = None,
     ) -> ConversationEvent:
-        session = self.session_manager.get_session(user_id, stream)
-
+        # o session_id é preenchido pelo roteamento, que já consulta a sessão
         return ConversationEvent(
             stream=stream,
             user_id=user_id,
-            session_id=session.session_id if session else None,
             agent_hint=agent_hint,
             modality=modality,
             content=text,
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 from cortex.contracts import ConversationEvent
 from cortex.decision import DecisionEngine
+from cortex.state import Session
 
 
 @dataclass
@@ -17,3 +19,6 @@ class Router:
 
     def route(self, event: ConversationEvent) -> str:
         return self.decision_engine.decide_agent(event)
+
+    def resolve(self, event: ConversationEvent) -> Tuple[str, Optional[Session]]:
+        return self.decision_engine.resolve(event)
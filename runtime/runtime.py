@@ -1,27 +1,33 @@
+import inspect
 from datetime import datetime
-from this import s
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from cortex.classify import classify_event
-from cortex.contracts import ActionType, Event, EventType
-from cortex.decision import DecisionEngine, DecisionLayer
+from cortex.contracts import (
+    Action,
+    ActionType,
+    ConversationEvent,
+    Event,
+    EventType,
+)
+from cortex.decision import DecisionLayer
 from cortex.policies import ChatPolicy, FoodPolicy, PolicyEngine
-from cortex.state import GlobalState, SessionManager
 from cortex.veto import VetoLayer
 from echo.echo import Echo
 from guard.guard import Guard
-from memory.store import MemoryStore
-from oracle.service import OracleService
-from runtime.router import Router
+from oracle.models import ActionResult
+from telemetry.metrics import NO_LAPS, Laps
 
 
 class NexusRuntime:
     def __init__(self, ctx):
         self.ctx = ctx
 
-        self.sessions = SessionManager()
-        self.memory = MemoryStore()
-        self.global_state = GlobalState()
+        # mesmas instâncias do contexto: uma consulta de sessão por evento
+        services = ctx.services
+        self.sessions = services.sessions
+        self.memory = services.memory
+        self.global_state = services.global_state
 
         self.policy_engine = PolicyEngine(
             [
@@ -31,13 +37,16 @@ class NexusRuntime:
         )
 
         self.decision_layer = DecisionLayer()
-        self.decision_engine = DecisionEngine(self.sessions)
-        self.router = Router(self.decision_engine)
+        self.decision_engine = services.decision_engine
+        self.router = services.router
 
         self.veto = VetoLayer()
         self.guard = Guard()
         self.echo = Echo()
-        self.oracle = OracleService()
+        self.oracle = services.oracle
+
+        self.background = services.background
+        self.metrics = services.metrics
 
     def handle_input(
         self,
@@ -45,6 +54,108 @@ class NexusRuntime:
         user_id: str,
         stream: str,
     ) -> Dict[str, Any]:
+        laps = self.metrics.start("runtime")
+        event, convo, agent_name, agent, session = self._route(text, user_id, stream)
+        laps.mark("route")
+
+        if not agent:
+            laps.finish(agent_name, None)
+            return {"agent": None, "action": None}
+
+        action = agent.think(convo, session)
+        laps.mark("think")
+
+        return self._act(
+            event, convo, agent_name, action, self.oracle.observe, _run_now, laps
+        )
+
+    async def ahandle_input(
+        self,
+        text: str,
+        user_id: str,
+        stream: str,
+    ) -> Dict[str, Any]:
+        """
+        Mesmo pipeline de `handle_input`, aceitando agentes assíncronos. A
+        observação entra na fila de escrita do Oracle e a memória vai para
+        tarefas em segundo plano.
+        """
+        laps = self.metrics.start("runtime")
+        event, convo, agent_name, agent, session = self._route(text, user_id, stream)
+        laps.mark("route")
+
+        if not agent:
+            laps.finish(agent_name, None)
+            return {"agent": None, "action": None}
+
+        action = agent.think(convo, session)
+        if inspect.isawaitable(action):
+            action = await action
+        laps.mark("think")
+
+        return self._act(
+            event,
+            convo,
+            agent_name,
+            action,
+            self.oracle.observe,
+            self.background.spawn,
+            laps,
+        )
+
+    def handle_batch(self, inputs: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Processa um lote de entradas (`text`, `user_id`, `stream`) em ordem.
+        Sessões são consultadas uma vez por usuário e todas as observações
+        vão para o Oracle em uma única transação.
+        """
+        sessions: Dict[Tuple[str, str], Any] = {}
+        observations: List[Dict[str, Any]] = []
+
+        def observe(event, action, result, metadata=None):
+            observations.append(
+                {
+                    "event": event,
+                    "action": action,
+                    "result": result,
+                    "metadata": metadata,
+                }
+            )
+
+        results = []
+        for item in inputs:
+            text, user_id, stream = item["text"], item["user_id"], item["stream"]
+
+            # "oracle" aqui mede só o acúmulo; a gravação é uma só no fim
+            laps = self.metrics.start("runtime.batch")
+            event, convo, agent_name, agent, session = self._route(
+                text, user_id, stream, sessions
+            )
+            laps.mark("route")
+
+            if not agent:
+                laps.finish(agent_name, None)
+                results.append({"agent": None, "action": None})
+                continue
+
+            action = agent.think(convo, session)
+            laps.mark("think")
+            results.append(
+                self._act(event, convo, agent_name, action, observe, _run_now, laps)
+            )
+
+        if observations:
+            self.oracle.observe_many(observations)
+
+        return results
+
+    def _route(
+        self,
+        text: str,
+        user_id: str,
+        stream: str,
+        sessions: Dict[Tuple[str, str], Any] | None = None,
+    ):
         # 1. Criar evento
         event = Event(
             type=EventType.TEXT,
@@ -57,57 +168,115 @@ class NexusRuntime:
             user_id=user_id,
             stream=stream,
         )
-        session = self.sessions.get_session(user_id, stream)
 
-        # 2. Roteamento
-        agent_name = self.router.route(convo)
+        # 2. Roteamento (consulta ou abre a sessão uma única vez)
+        session = sessions.get((user_id, stream)) if sessions is not None else None
+        if session is not None:
+            self.sessions.update_activity(session)
+            convo.session_id = session.session_id
+            agent_name = session.agent
+        else:
+            agent_name, session = self.router.resolve(convo)
         agent = self.ctx.agents.get(agent_name)
 
         # classification = classify_event(event)
         # actions = self.policy_engine.run(event, classification)
         # action = self.decision_layer.decide(actions)
 
-        if not agent:
-            return {"agent": None, "action": None}
-
-        if not session:
+        if agent and not session:
             session = self.sessions.start_session(
                 user_id=user_id, stream=stream, agent=agent_name
             )
 
-        action = agent.think(convo, session)
+        if sessions is not None:
+            sessions[(user_id, stream)] = session
+
+        return event, convo, agent_name, agent, session
 
+    def _act(
+        self,
+        event: Event,
+        convo: ConversationEvent,
+        agent_name: str,
+        action: Optional[Action],
+        observe: Callable[..., Any],
+        defer: Callable[..., Any],
+        laps: Laps | None = None,
+    ) -> Dict[str, Any]:
+        laps = laps or NO_LAPS
+        try:
+            return self._apply(event, convo, agent_name, action, observe, defer, laps)
+        finally:
+            laps.finish(agent_name, action.type if action else None)
+
+    def _apply(
+        self,
+        event: Event,
+        convo: ConversationEvent,
+        agent_name: str,
+        action: Optional[Action],
+        observe: Callable[..., Any],
+        defer: Callable[..., Any],
+        laps: Laps,
+    ) -> Dict[str, Any]:
+        # `observe` e `defer` decidem se os efeitos colaterais rodam já,
+        # em background ou acumulados para o lote
         if not action or action.type == ActionType.NO_OP:
             return {"agent": agent_name, "action": None}
 
         # 6. Veto
-        if self.veto.veto(action, {}):
-            self.oracle.observe(event, action, "IGNORED", {"vetoed": True})
-            return {"agent": agent, "action": None}
+        vetoed = self.veto.veto(action, {})
+        laps.mark("veto")
+        if vetoed:
+            observe(
+                event,
+                action,
+                ActionResult.IGNORED,
+                {"vetoed": True},
+            )
+            laps.mark("oracle")
+            return {"agent": agent_name, "action": None}
 
         # 7. Guard
         guard_result = self.guard.check(action, self.global_state, event)
+        laps.mark("guard")
         if not guard_result.allowed:
-            self.oracle.observe(
-                event, action, "BLOCKED", {"reason": guard_result.reason}
+            observe(
+                event,
+                action,
+                ActionResult.IGNORED,
+                {"reason": guard_result.reason},
             )
-            return {"agent": agent, "action": None}
+            laps.mark("oracle")
+            return {"agent": agent_name, "action": None}
 
         # 8. Execução
         result = self.echo.execute(action)
 
         # Atualiza estado global
         self.global_state.last_action_time = datetime.now()
+        laps.mark("echo")
 
         # Oracle
-        self.oracle.observe(event, action, result)
+        observe(event, action, result)
+        laps.mark("oracle")
 
         # 10. Memória
         if action.type == ActionType.SEND_MESSAGE:
-            self.memory.remember(stream, action.payload.get("text", ""))
+            defer(
+                self.memory.remember,
+                convo.stream,
+                action.payload.get("text", ""),
+                convo.user_id,
+            )
+            laps.mark("memory")
 
         return {
-            "agent": agent,
-            "action": action.dict(),
+            "agent": agent_name,
+            "action": action.model_dump(),
             "result": result,
         }
+
+
+def _run_now(fn: Callable[..., Any], *args, **kwargs):
+    fn(*args, **kwargs)
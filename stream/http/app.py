@@ -1,14 +1,31 @@
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
 from fastapi import FastAPI
 
-from oracle.service import OracleService
+from runtime.container import container
 from stream.http.routes import router
 
+if TYPE_CHECKING:
+    from oracle.service import OracleService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # garante que as tarefas e as observações na fila do Oracle sejam
+    # gravadas antes de sair (o Oracle só existe se alguém o usou)
+    services = container()
+    await services.background.drain()
+    if "oracle" in vars(services):
+        services.oracle.storage.flush()
 
-def create_app() -> FastAPI:
-    oracle_service = OracleService()
 
-    app = FastAPI(title="Nexus")
-    app.state.oracle = oracle_service
+def create_app(oracle: "OracleService | None" = None) -> FastAPI:
+    app = FastAPI(title="Nexus", lifespan=lifespan)
+    # sem `oracle`, as rotas usam o do container (o mesmo que o pipeline
+    # usa para gravar), criado na primeira requisição e não no import
+    app.state.oracle = oracle
     app.include_router(router)
 
     return app
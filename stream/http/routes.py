@@ -1,20 +1,34 @@
 import uuid
+from datetime import datetime
+from typing import List
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 from cortex.contracts import Event
-from cortex.core import handle_event
+from cortex.core import ahandle_event, handle_events
+from runtime.container import container
 
 router = APIRouter()
 
+# eventos por requisição em /events/batch; o lote inteiro é processado
+# no loop e gravado em uma só transação
+MAX_BATCH_EVENTS = 1_000
+
+
+def _oracle(request: Request):
+    # o OracleService (e o oracle.db) só é aberto na primeira requisição
+    oracle = getattr(request.app.state, "oracle", None)
+    return oracle if oracle is not None else container().oracle
+
 
 @router.post("/event")
-def receive_event(event: Event, request: Request):
+async def receive_event(event: Event, request: Request):
     if not event.id:
         event.id = str(uuid.uuid4())
 
-    action = handle_event(event)
+    action = await ahandle_event(event)
 
     return {
         "event_id": event.id,
@@ -22,19 +36,56 @@ def receive_event(event: Event, request: Request):
     }
 
 
+# `def` simples: o FastAPI roda o lote no threadpool, fora do loop, e as
+# outras conexões não esperam pelos até MAX_BATCH_EVENTS eventos
+@router.post("/events/batch")
+def receive_events(events: List[Event], request: Request):
+    if len(events) > MAX_BATCH_EVENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote com {len(events)} eventos; o máximo é {MAX_BATCH_EVENTS}",
+        )
+
+    for event in events:
+        if not event.id:
+            event.id = str(uuid.uuid4())
+
+    actions = handle_events(events)
+
+    return [
+        {
+            "event_id": event.id,
+            "action": action,
+        }
+        for event, action in zip(events, actions)
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # latência por estágio no formato de texto do Prometheus
+    metrics = container().metrics
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Métricas desligadas")
+
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @router.get("/oracle/metrics")
 def oracle_metrics(request: Request):
-    metrics = request.app.state.oracle.metrics()
+    snapshot = _oracle(request).metrics().snapshot()
     return {
-        "success_rate": metrics.success_rate(),
-        "average_confidence": metrics.average_confidence(),
-        "actions_count": dict(metrics.actions_count()),
+        "success_rate": snapshot["success_rate"],
+        "average_confidence": snapshot["average_confidence"],
+        "actions_count": dict(snapshot["actions_count"]),
     }
 
 
 @router.get("/oracle/insights")
-def oracle_insights(request: Request):
-    insights = request.app.state.oracle.analyze()
+def oracle_insights(request: Request, since: datetime | None = None):
+    insights = _oracle(request).analyze(since=since)
     return [
         {
             "ts": i.ts,
@@ -50,7 +101,7 @@ def oracle_insights(request: Request):
 
 @router.get("/oracle/history")
 def oracle_history(request: Request, limit: int = 100):
-    history = request.app.state.oracle.storage.load(limit=limit)
+    history = _oracle(request).storage.load(limit=limit)
     return [
         {
             "ts": r.ts,
@@ -67,8 +118,8 @@ def oracle_history(request: Request, limit: int = 100):
 
 
 @router.get("/oracle/feedback")
-def oracle_feedback(request: Request):
-    actions = request.app.state.oracle.feedback()
+def oracle_feedback(request: Request, since: datetime | None = None):
+    actions = _oracle(request).feedback(since=since)
     return [
         {
             "index": idx,
@@ -85,6 +136,7 @@ def oracle_feedback(request: Request):
 class FeedbackApproval(BaseModel):
     index: int  # índice da ação na lista retornada
     approved: bool
+    since: datetime | None = None  # mesma janela usada em /oracle/feedback
 
 
 @router.post("/oracle/feedback/approve")
@@ -92,7 +144,7 @@ def approve_feedback(request: Request, body: FeedbackApproval):
     """
     Aprova ou rejeita uma ação de feedback pelo índice
     """
-    actions = request.app.state.oracle.feedback()
+    actions = _oracle(request).feedback(since=body.since)
     if body.index < 0 or body.index >= len(actions):
         return {"error": "Índice inválido"}
 
@@ -1,51 +1,114 @@
-import socket
-import threading
+import asyncio
 
 from cortex.contracts import ConversationEvent
-from cortex.decision import DecisionEngine
 from cortex.state import SessionManager
 from echo.echo import Echo
+from runtime.container import Container, container
+from telemetry.log import get_logger
 
 ECHO = Echo()
+LOG = get_logger("stream.terminal")
 
 HOST = "127.0.0.1"
 PORT = 8765
 
+MAX_CONNECTIONS = 10_000
+# maior linha aceita; também limita o buffer de leitura de cada conexão
+MAX_LINE_BYTES = 4096
 
-class TerminalStreamServer:
-    def __init__(self):
-        self.sessions = SessionManager()
-        self.decision = DecisionEngine(self.sessions)
 
-    def handle_client(self, conn: socket.socket, addr):
-        user_id = f"terminal:{addr[1]}"
+class TerminalStreamServer:
+    """
+    Servidor de terminal em asyncio: uma corrotina por conexão, mensagens
+    delimitadas por "\\n", `drain()` para respeitar clientes lentos, limite
+    de conexões e desconexão de clientes ociosos após o timeout da sessão.
+    """
+
+    def __init__(
+        self,
+        host: str = HOST,
+        port: int = PORT,
+        max_connections: int = MAX_CONNECTIONS,
+        idle_timeout: float | None = None,
+        services: Container | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.idle_timeout = (
+            SessionManager.TIMEOUT_SECONDS if idle_timeout is None else idle_timeout
+        )
+
+        services = services or container()
+        self.sessions = services.sessions
+        self.decision = services.decision_engine
+
+        self.connections = 0
+        self.rejected = 0
+
+    def respond(self, text: str, user_id: str) -> str:
+        event = ConversationEvent(
+            stream="terminal",
+            user_id=user_id,
+            agent_hint=self.extract_agent_hint(text),
+            content=text,
+        )
+
+        agent = self.decision.decide_agent(event)
+        reply = ECHO.respond(agent, text)
+        LOG.debug("mensagem respondida", user_id=user_id, agent=agent, text=text)
+
+        return reply
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        if self.connections >= self.max_connections:
+            self.rejected += 1
+            writer.write("servidor cheio, tente novamente mais tarde\n".encode())
+            await self._close(writer)
+            return
+
+        self.connections += 1
+        user_id = f"terminal:{writer.get_extra_info('peername')[1]}"
 
         try:
             while True:
-                data = conn.recv(4096)
-                if not data:
+                try:
+                    line = await asyncio.wait_for(
+                        reader.readline(), timeout=self.idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    break  # a sessão já teria expirado: libera a conexão
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(f"linha maior que {MAX_LINE_BYTES} bytes\n".encode())
                     break
 
-                text = data.decode().strip()
+                if not line:
+                    break  # EOF
+
+                text = line.decode(errors="replace").strip()
                 if not text:
                     continue
 
-                event = ConversationEvent(
-                    stream="terminal",
-                    user_id=user_id,
-                    agent_hint=self.extract_agent_hint(text),
-                    content=text,
-                )
-
-                agent = self.decision.decide_agent(event)
-                reply = ECHO.respond(agent, text)
-                print("agent:", agent, "text:", text)
-                print("reply:", reply)
+                writer.write((self.respond(text, user_id) + "\n").encode())
+                # backpressure: espera o cliente consumir antes de ler mais
+                await writer.drain()
 
-                conn.sendall((reply + "\n").encode())
+        except ConnectionError:
+            pass
 
         finally:
-            conn.close()
+            self.connections -= 1
+            await self._close(writer)
+
+    @staticmethod
+    async def _close(writer: asyncio.StreamWriter):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
 
     @staticmethod
     def extract_agent_hint(text: str):
@@ -56,21 +119,30 @@ class TerminalStreamServer:
             return "dominus"
         return None
 
-    def serve(self):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind((HOST, PORT))
-            s.listen()
+    async def start(self) -> asyncio.Server:
+        self.sessions.start_reaper()
 
-            print(f"[TerminalStream] Escutando em {HOST}:{PORT}")
+        server = await asyncio.start_server(
+            self.handle_client,
+            self.host,
+            self.port,
+            limit=MAX_LINE_BYTES,
+            backlog=1024,
+        )
 
-            while True:
-                conn, addr = s.accept()
-                thread = threading.Thread(
-                    target=self.handle_client,
-                    args=(conn, addr),
-                    daemon=True,
-                )
-                thread.start()
+        LOG.info("servidor escutando", host=self.host, port=self.port)
+        return server
+
+    async def serve_async(self):
+        server = await self.start()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.sessions.stop_reaper()
+
+    def serve(self):
+        asyncio.run(self.serve_async())
 
 
 def main():
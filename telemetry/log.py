@@ -0,0 +1,223 @@
+"""
+Logs estruturados do Nexus sobre o loguru.
+
+Cada componente pega o seu logger com `get_logger("oracle")`. O nível é
+checado antes de qualquer formatação: um `debug` desligado custa uma
+comparação de inteiros. Os registros aceitos vão para uma fila
+(`enqueue=True`) e são escritos por uma thread do loguru, fora do caminho
+da requisição, como uma linha JSON por registro.
+
+Configuração por ambiente (ou por `configure`):
+
+    NEXUS_LOG_LEVEL=INFO                       nível padrão
+    NEXUS_LOG_LEVELS=oracle=WARNING,cortex=DEBUG   nível por componente
+    NEXUS_LOG_FORMAT=json|text
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import timezone
+from typing import Any, Dict, Mapping, TextIO
+
+# números dos níveis do loguru; o gate não precisa importar a biblioteca
+LEVELS = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "SUCCESS": 25,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
+
+DEFAULT_LEVEL = "INFO"
+
+
+class ComponentLogger:
+    """Logger de um componente; `fields` viram chaves do JSON."""
+
+    __slots__ = ("component", "level_no", "_logger")
+
+    def __init__(self, component: str, level_no: int):
+        self.component = component
+        self.level_no = level_no
+        self._logger = None
+
+    def enabled(self, level: str) -> bool:
+        return LEVELS[level] >= self.level_no
+
+    def log(
+        self,
+        level: str,
+        message: str,
+        exception: BaseException | None = None,
+        **fields: Any,
+    ):
+        if LEVELS[level] < self.level_no:
+            return
+
+        logger = self._logger
+        if logger is None:
+            logger = self._logger = _bound(self.component)
+
+        # campos vão como `extra`; a mensagem nunca é usada como template
+        if exception is not None:
+            logger = logger.opt(exception=exception)
+        logger.bind(**fields).log(level, "{}", message)
+
+    def debug(self, message: str, **fields: Any):
+        self.log("DEBUG", message, **fields)
+
+    def info(self, message: str, **fields: Any):
+        self.log("INFO", message, **fields)
+
+    def warning(self, message: str, **fields: Any):
+        self.log("WARNING", message, **fields)
+
+    def error(
+        self, message: str, exception: BaseException | None = None, **fields: Any
+    ):
+        self.log("ERROR", message, exception, **fields)
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        component, _, level = item.partition("=")
+        levels[component.strip()] = level.strip().upper()
+    return levels
+
+
+_LOGGERS: Dict[str, ComponentLogger] = {}
+_LOCK = threading.Lock()
+
+# níveis vindos do ambiente já no import; a saída só é criada no 1º uso
+_default_level = LEVELS.get(
+    os.environ.get("NEXUS_LOG_LEVEL", DEFAULT_LEVEL).upper(), LEVELS[DEFAULT_LEVEL]
+)
+_component_levels: Dict[str, int] = {
+    component: LEVELS[level]
+    for component, level in parse_levels(os.environ.get("NEXUS_LOG_LEVELS", "")).items()
+    if level in LEVELS
+}
+_configured = False
+
+
+def get_logger(component: str) -> ComponentLogger:
+    with _LOCK:
+        logger = _LOGGERS.get(component)
+        if logger is None:
+            logger = _LOGGERS[component] = ComponentLogger(
+                component, _level_for(component)
+            )
+        return logger
+
+
+def _level_for(component: str) -> int:
+    # "oracle.observer" herda de "oracle" quando não tem nível próprio
+    name = component
+    while name:
+        if name in _component_levels:
+            return _component_levels[name]
+        name = name.rpartition(".")[0]
+    return _default_level
+
+
+def configure(
+    level: str | None = None,
+    levels: Mapping[str, str] | None = None,
+    sink: TextIO | None = None,
+    fmt: str | None = None,
+    enqueue: bool = True,
+):
+    """
+    (Re)configura níveis e a saída. Sem argumentos, lê o ambiente. Remove
+    os handlers anteriores do loguru, inclusive o padrão no stderr.
+    """
+    global _default_level, _configured
+
+    level = (level or os.environ.get("NEXUS_LOG_LEVEL") or DEFAULT_LEVEL).upper()
+    if levels is None:
+        levels = parse_levels(os.environ.get("NEXUS_LOG_LEVELS", ""))
+    fmt = fmt or os.environ.get("NEXUS_LOG_FORMAT", "json")
+
+    for name in (level, *levels.values()):
+        if name not in LEVELS:
+            raise ValueError(f"Nível de log desconhecido: {name}")
+
+    with _LOCK:
+        _default_level = LEVELS[level]
+        _component_levels.clear()
+        _component_levels.update({c: LEVELS[l] for c, l in levels.items()})
+
+        for logger in _LOGGERS.values():
+            logger.level_no = _level_for(logger.component)
+
+        from loguru import logger
+
+        logger.remove()
+        # o loguru só descarta antes de formatar abaixo do menor nível
+        lowest = min((_default_level, *_component_levels.values()))
+        output = sink or sys.stderr
+        json_output = fmt == "json"
+        logger.add(
+            _JsonSink(output) if json_output else output,
+            level=lowest,
+            format="{message}" if json_output else TEXT_FORMAT,
+            enqueue=enqueue,
+            colorize=False,
+            catch=True,
+        )
+        _configured = True
+
+
+TEXT_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | "
+    "{extra[component]} | {message} {extra}"
+)
+
+
+class _JsonSink:
+    """Uma linha JSON por registro, escrita pela thread da fila."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write(self, message):
+        record = message.record
+        extra = dict(record["extra"])
+
+        entry = {
+            "ts": record["time"].astimezone(timezone.utc).isoformat(),
+            "level": record["level"].name,
+            "component": extra.pop("component", None),
+            "message": record["message"],
+        }
+        entry.update(extra)
+        if record["exception"] is not None:
+            # o traceback já vem formatado depois da mensagem (ele não
+            # atravessa a fila como objeto)
+            entry["exception"] = str(message)[len(record["message"]) :].strip()
+
+        self.stream.write(json.dumps(entry, default=str, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+def flush():
+    """Espera a fila esvaziar (testes, shutdown controlado)."""
+    if _configured:
+        from loguru import logger
+
+        logger.complete()
+
+
+def _bound(component: str):
+    # a primeira mensagem aceita configura a saída a partir do ambiente
+    if not _configured:
+        configure()
+
+    from loguru import logger
+
+    return logger.bind(component=component)
@@ -0,0 +1,198 @@
+"""
+Latência por estágio do pipeline, em histogramas de memória fixa.
+
+Cada evento abre um `Laps` (`metrics.start("runtime")`) e marca o fim de
+cada estágio com `laps.mark("guard")`; no fim, `laps.finish(agent, action)`
+grava as durações em um histograma por (pipeline, estágio, agente, tipo de
+ação). Desligado (`NEXUS_METRICS=0`), `start` devolve um objeto sem efeito
+e o custo é o de chamar métodos vazios.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 8 sub-buckets por oitava: erro relativo de no máximo 12,5%
+SUB_BITS = 3
+SUB_BUCKETS = 1 << SUB_BITS
+# de 1µs até 2^26 µs (~67 s); acima disso cai no último bucket
+MAX_MICROS = 1 << 26
+
+# fronteiras exportadas para o Prometheus: potências de 2 em µs, que
+# coincidem com fronteiras de bucket (contagens exatas)
+EXPORT_OCTAVES = range(3, 27)  # 8µs .. ~67s
+
+
+def _index(micros: int) -> int:
+    if micros < SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - SUB_BITS - 1
+    return shift * SUB_BUCKETS + (micros >> shift)
+
+
+def _bounds(index: int) -> Tuple[int, int]:
+    # [início, fim) do bucket em µs
+    shift = max(index // SUB_BUCKETS - 1, 0)
+    sub = index - shift * SUB_BUCKETS
+    return sub << shift, (sub + 1) << shift
+
+
+BUCKETS = _index(MAX_MICROS) + 1
+
+
+class LatencyHistogram:
+    """
+    Histograma log-linear no estilo HDR: contagens em buckets fixos, então
+    a memória não cresce com o número de amostras.
+    """
+
+    __slots__ = ("counts", "count", "sum_ns")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.sum_ns = 0
+
+    def record(self, ns: int):
+        micros = min(ns // 1000, MAX_MICROS)
+        self.counts[_index(micros)] += 1
+        self.count += 1
+        self.sum_ns += ns
+
+    def quantile(self, q: float) -> float:
+        """Limite superior, em segundos, do bucket do quantil `q`."""
+        if not self.count:
+            return 0.0
+
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return _bounds(index)[1] / 1e6
+        return MAX_MICROS / 1e6
+
+    def cumulative(self) -> Iterable[Tuple[float, int]]:
+        # (le em segundos, contagem <= le) nas fronteiras exportadas
+        seen, index = 0, 0
+        for octave in EXPORT_OCTAVES:
+            limit = _index(1 << octave)
+            while index < limit:
+                seen += self.counts[index]
+                index += 1
+            yield (1 << octave) / 1e6, seen
+
+
+Key = Tuple[str, str, str, str]  # pipeline, estágio, agente, ação
+
+
+class Laps:
+    """Cronômetro de um evento: cada `mark` fecha um estágio."""
+
+    __slots__ = ("metrics", "pipeline", "marks", "last")
+
+    def __init__(self, metrics: "StageMetrics", pipeline: str):
+        self.metrics = metrics
+        self.pipeline = pipeline
+        self.marks: List[Tuple[str, int]] = []
+        self.last = time.perf_counter_ns()
+
+    def mark(self, stage: str):
+        now = time.perf_counter_ns()
+        self.marks.append((stage, now - self.last))
+        self.last = now
+
+    def finish(self, agent: Optional[str], action: Optional[str]):
+        self.metrics.record(self.pipeline, agent, action, self.marks)
+
+
+class _NoLaps:
+    # mesmo protocolo do Laps, sem custo quando as métricas estão desligadas
+    __slots__ = ()
+
+    def mark(self, stage: str):
+        pass
+
+    def finish(self, agent: Optional[str], action: Optional[str]):
+        pass
+
+
+NO_LAPS = _NoLaps()
+
+
+class StageMetrics:
+    """Histogramas de latência por estágio, exportados no formato Prometheus."""
+
+    NAME = "nexus_stage_latency_seconds"
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: Dict[Key, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def start(self, pipeline: str) -> Laps:
+        return Laps(self, pipeline) if self.enabled else NO_LAPS
+
+    def record(
+        self,
+        pipeline: str,
+        agent: Optional[str],
+        action: Optional[str],
+        marks: Iterable[Tuple[str, int]],
+    ):
+        # enums (ActionType) viram o valor; None vira "none"
+        agent = agent or "none"
+        action = getattr(action, "value", action) or "none"
+
+        with self._lock:
+            for stage, ns in marks:
+                key = (pipeline, stage, agent, action)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = LatencyHistogram()
+                histogram.record(ns)
+
+    def snapshot(self) -> Dict[Key, LatencyHistogram]:
+        # cópia rasa dos contadores para exportar sem segurar o lock
+        with self._lock:
+            copies = {}
+            for key, histogram in self.histograms.items():
+                copy = LatencyHistogram()
+                copy.counts = list(histogram.counts)
+                copy.count = histogram.count
+                copy.sum_ns = histogram.sum_ns
+                copies[key] = copy
+        return copies
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.NAME} Latência de cada estágio do pipeline.",
+            f"# TYPE {self.NAME} histogram",
+        ]
+
+        for key, histogram in sorted(self.snapshot().items()):
+            labels = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(("pipeline", "stage", "agent", "action"), key)
+            )
+            for le, count in histogram.cumulative():
+                lines.append(f'{self.NAME}_bucket{{{labels},le="{le:g}"}} {count}')
+            lines.append(f'{self.NAME}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{self.NAME}_sum{{{labels}}} {histogram.sum_ns / 1e9:.9f}")
+            lines.append(f"{self.NAME}_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def default_stage_metrics() -> StageMetrics:
+    # NEXUS_METRICS=0 desliga a coleta e o /metrics
+    return StageMetrics(enabled=os.environ.get("NEXUS_METRICS", "1") != "0")
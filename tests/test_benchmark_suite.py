@@ -0,0 +1,44 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from benchmarks.suite import compare, corpus, measure
+from guard.guard import Guard
+
+BASELINE = {"events_per_sec": 1000.0, "p50_ms": 1.0, "p99_ms": 2.0, "peak_rss_mb": 50.0}
+
+
+def test_compare_flags_only_regressions_past_threshold():
+    within = {
+        "events_per_sec": 800.0,
+        "p50_ms": 9.0,  # p50 não entra na comparação
+        "p99_ms": 2.4,
+        "peak_rss_mb": 60.0,
+    }
+    assert compare(within, BASELINE, threshold=0.25) == []
+
+    worse = {"events_per_sec": 700.0, "p50_ms": 1.0, "p99_ms": 3.0, "peak_rss_mb": 50.0}
+    regressions = compare(worse, BASELINE, threshold=0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("vazão")
+    assert regressions[1].startswith("p99_ms")
+
+
+def test_corpus_is_reproducible_and_runtime_scenario_reports(tmp_path):
+    assert list(corpus(20)) == list(corpus(20))
+
+    result = measure("runtime", 50, tmp_path)
+
+    assert set(result) == {"events_per_sec", "p50_ms", "p99_ms", "peak_rss_mb"}
+    assert result["events_per_sec"] > 0
+    assert 0 < result["p50_ms"] <= result["p99_ms"]
+
+    # sem o cooldown do Guard as ações chegam a ser executadas; depois da
+    # medição ele volta ao valor normal
+    with sqlite3.connect(tmp_path / "oracle.db") as conn:
+        executed = conn.execute(
+            "SELECT COUNT(*) FROM observations WHERE result = 'success'"
+        ).fetchone()[0]
+    assert executed > 1
+    assert Guard.COOLDOWN_SECONDS == 5
@@ -0,0 +1,150 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from cortex.classify import Intent, KeywordClassifier, Topic, classify_event
+from cortex.contracts import Action, ActionType, Event, EventType
+from cortex.decision import Candidate, DecisionLayer
+from cortex.policies import BasePolicy, PolicyEngine
+
+
+def legacy_classify(text: str):
+    text = text.lower()
+    intent, topic, confidence = Intent.CHAT, Topic.UNKNOWN, 0.5
+
+    if any(word in text for word in ["ligar", "desligar", "abrir", "fechar"]):
+        intent, confidence = Intent.COMMAND, 0.8
+    if any(word in text for word in ["bolo", "cookie", "comida", "receita", "torta"]):
+        topic, confidence = Topic.FOOD, 0.7
+    if any(word in text for word in ["chuva", "clima", "tempo"]):
+        topic, confidence = Topic.WEATHER, 0.7
+    if any(word in text for word in ["namorado", "namorada", "marido", "esposa"]):
+        topic, confidence = Topic.RELATIONSHIP, 0.7
+
+    return {"intent": intent, "topic": topic, "confidence": confidence}
+
+
+def text_event(text: str) -> Event:
+    return Event(type=EventType.TEXT, source="terminal", payload={"text": text})
+
+
+def test_classifier_matches_legacy_rules():
+    rng = random.Random(3)
+    pieces = [
+        "Ligar",
+        "desligar",
+        "bolo",
+        "tempo",
+        "namorada",
+        "esposa",
+        "oi",
+        "clima",
+        "torta",
+        "abrir",
+        "x",
+        " ",
+        "receitas",
+        "maridos",
+    ]
+
+    for _ in range(2000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 6)))
+        assert classify_event(text_event(text)) == legacy_classify(text), text
+
+
+def test_overlapping_keywords_are_all_found():
+    classifier = KeywordClassifier()
+    classifier.register("intent", "command", ["ligar"], 0.8)
+    classifier.register("topic", "power", ["desligar"], 0.7)
+
+    assert classifier.matches("desligar") == {
+        ("intent", "command"),
+        ("topic", "power"),
+    }
+
+
+def test_register_topic_at_runtime():
+    classifier = KeywordClassifier()
+    classifier.register("topic", Topic.FOOD, ["bolo"], 0.7)
+    assert classifier.classify("vamos viajar")["topic"] == Topic.UNKNOWN
+
+    classifier.register("topic", "travel", ["viajar"], 0.6)
+    assert classifier.classify("vamos viajar") == {
+        "intent": Intent.CHAT,
+        "topic": "travel",
+        "confidence": 0.6,
+    }
+
+
+class RecordingPolicy(BasePolicy):
+    def __init__(self, name, intents=None, topics=None):
+        self.name = name
+        self.intents = intents
+        self.topics = topics
+        self.seen = 0
+
+    def applies(self, event, classification):
+        self.seen += 1
+        return True
+
+    def evaluate(self, event, classification):
+        return [Action.no_op(self.name)]
+
+
+def test_policy_engine_only_evaluates_candidates():
+    food = RecordingPolicy("food", topics=frozenset({Topic.FOOD}))
+    chat = RecordingPolicy("chat", intents=frozenset({Intent.CHAT}))
+    legacy = RecordingPolicy("legacy")
+
+    engine = PolicyEngine([food, chat, legacy], timing=True)
+    classification = {"intent": Intent.COMMAND, "topic": Topic.FOOD}
+
+    actions = engine.run(text_event("ligar forno do bolo"), classification)
+
+    assert [a.payload["reason"] for a in actions] == ["food", "legacy"]
+    assert chat.seen == 0
+    assert set(engine.stats()) == {"food", "legacy"}
+
+
+def make_action(priority: int, confidence: float, text: str) -> Action:
+    return Action(
+        type=ActionType.SEND_MESSAGE,
+        target="terminal",
+        payload={"text": text},
+        priority=priority,
+        confidence=confidence,
+    )
+
+
+def test_decision_layer_top_k_is_stable_and_keeps_origin():
+    proposals = [
+        Candidate(make_action(1, 0.6, "a"), "chat_policy", 0),
+        Candidate(Action.no_op("skip"), "noop_policy", 1),
+        Candidate(make_action(5, 0.9, "b"), "food_policy", 2),
+        Candidate(make_action(5, 0.9, "c"), "food_policy", 3),
+    ]
+    layer = DecisionLayer()
+
+    top = layer.select(proposals, k=3)
+
+    assert [c.action.payload["text"] for c in top] == ["b", "c", "a"]
+    assert [c.origin for c in top] == ["food_policy", "food_policy", "chat_policy"]
+    assert layer.decide(proposals).payload["text"] == "b"
+    assert layer.decide([Action.no_op()]) is None
+
+
+def test_fast_actions_match_validated_ones():
+    fields = dict(
+        type=ActionType.SEND_MESSAGE,
+        target="terminal",
+        payload={"text": "oi"},
+        priority=1,
+        confidence=0.6,
+    )
+
+    assert Action.fast(**fields).model_dump() == Action(**fields).model_dump()
+    assert Action.no_op("x") is Action.no_op("x")
+    assert Action.no_op("x").payload == {"reason": "x"}
+    assert Action.no_op().payload == {}
@@ -0,0 +1,87 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from memory.longterm import LongTermMemory
+from memory.store import MemoryStore
+
+
+def test_evicted_items_are_searchable_per_user(tmp_path):
+    long_term = LongTermMemory(tmp_path / "memory.db")
+    store = MemoryStore(long_term=long_term)
+
+    try:
+        store.remember("terminal", "receita de bolo de cenoura", "ana")
+        store.remember("terminal", "bolo de chocolate com cobertura", "bia")
+        for i in range(30):
+            store.remember("terminal", f"mensagem qualquer {i}", "ana")
+
+        # o bolo da Ana saiu do curto prazo, mas continua no longo prazo
+        assert "receita de bolo de cenoura" not in store.recall("terminal", 20, "ana")
+        assert store.search("terminal", "bolo", 3, "ana") == [
+            "receita de bolo de cenoura"
+        ]
+        assert store.search("terminal", "bolo", 3, "bia") == [
+            "bolo de chocolate com cobertura"
+        ]
+        assert store.search("terminal", 'AND "(', 3, "ana") == []
+    finally:
+        long_term.close()
+
+
+def test_long_term_ranks_with_bm25(tmp_path):
+    long_term = LongTermMemory(tmp_path / "memory.db")
+
+    try:
+        long_term.add("http:a", "vai ter chuva amanhã de manhã cedo")
+        long_term.add("http:a", "chuva chuva chuva")
+        long_term.add("http:a", "nada a ver")
+        long_term.add("http:b", "chuva")
+
+        assert long_term.search("http:a", "chuva", 5) == [
+            "chuva chuva chuva",
+            "vai ter chuva amanhã de manhã cedo",
+        ]
+    finally:
+        long_term.close()
+
+
+def test_budget_evicts_least_recently_used_shards():
+    store = MemoryStore(items_per_shard=3, max_items=5)
+
+    store.remember("terminal", "a1", "a")
+    store.remember("terminal", "b1", "b")
+    store.remember("terminal", "c1", "c")
+    store.recall("terminal", user_id="a")  # "a" volta a ser recente
+    for i in range(3):
+        store.remember("terminal", f"d{i}", "d")
+
+    assert store.recall("terminal", user_id="b") == []
+    assert store.recall("terminal", 5, "a") == ["a1"]
+    assert store.recall("terminal", 2, "d") == ["d1", "d2"]
+    assert store.stats() == {
+        "shards": 3,
+        "items": 5,
+        "bytes": store.total_bytes,
+        "evicted_shards": 1,
+    }
+
+
+def test_concurrent_remember_keeps_totals_consistent():
+    store = MemoryStore(items_per_shard=5, max_items=50)
+
+    def worker(user):
+        for i in range(200):
+            store.remember("terminal", f"msg {i}", user)
+            store.recall("terminal", user_id=user)
+
+    threads = [threading.Thread(target=worker, args=(f"u{n}",)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.total_items == sum(len(s.items) for s in store.shards.values())
+    assert store.total_items <= 50
@@ -0,0 +1,121 @@
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from oracle.analyzer import IncrementalOracleAnalyzer, OracleAnalyzer, SqlOracleAnalyzer
+from oracle.models import ActionResult, OracleRecord
+from oracle.storage import OracleStorage
+
+
+def make_history(n: int = 400, seed: int = 7) -> list[OracleRecord]:
+    rng = random.Random(seed)
+    now = datetime.now()
+    history = []
+
+    for i in range(n):
+        # metade antiga (hábitos), metade nos últimos minutos (frequência)
+        if i % 2:
+            ts = now - timedelta(days=rng.randint(1, 30))
+            ts = ts.replace(hour=7, minute=rng.randint(0, 20))
+            source = "Luiz"
+        else:
+            ts = now - timedelta(seconds=rng.randint(1, 300))
+            source = rng.choice(["Vinicius", "Ana Paula"])
+
+        policy = rng.choice(["food_policy", "chat_policy", "weather_policy"])
+        result = rng.choice(list(ActionResult))
+        if policy == "weather_policy":
+            result = ActionResult.FAILED
+
+        history.append(
+            OracleRecord(
+                ts=ts,
+                event_type="text",
+                source=source,
+                action_type=rng.choice(["make_coffee", "open_window"]),
+                target=rng.choice(["cozinha", "sala"]),
+                confidence=rng.uniform(0.0, 0.5),
+                priority=1,
+                result=result,
+                metadata={"policy": policy},
+            )
+        )
+
+    history.sort(key=lambda r: r.ts)
+    return history
+
+
+def as_tuples(insights):
+    return [
+        (i.type, i.source, i.description, i.confidence, i.metadata) for i in insights
+    ]
+
+
+def test_incremental_matches_batch():
+    history = make_history()
+
+    batch = OracleAnalyzer(history).analyze()
+
+    incremental = IncrementalOracleAnalyzer()
+    for rec in history:
+        incremental.add(rec)
+
+    assert batch
+    assert as_tuples(incremental.analyze()) == as_tuples(batch)
+
+
+def test_sql_matches_batch(tmp_path):
+    history = make_history()
+    storage = OracleStorage(tmp_path / "oracle.db")
+    storage.save_many(history)
+
+    batch = OracleAnalyzer(storage.load()).analyze()
+    sql = SqlOracleAnalyzer(storage.db_path).analyze()
+
+    assert [(i.type, i.source, i.description) for i in sql] == [
+        (i.type, i.source, i.description) for i in batch
+    ]
+    for got, expected in zip(sql, batch):
+        assert got.confidence == pytest.approx(expected.confidence)
+        assert got.metadata == pytest.approx(expected.metadata)
+
+
+def test_sql_accepts_timezone_aware_window(tmp_path):
+    history = make_history()
+    storage = OracleStorage(tmp_path / "oracle.db")
+    storage.save_many(history)
+
+    # ?since=...Z chega com fuso; a janela de frequência é hora local
+    since = datetime.now(timezone.utc) - timedelta(days=1)
+    sql = SqlOracleAnalyzer(storage.db_path, since=since).analyze()
+    batch = OracleAnalyzer(storage.load_range(since)).analyze()
+
+    assert sql
+    assert [(i.type, i.source, i.description) for i in sql] == [
+        (i.type, i.source, i.description) for i in batch
+    ]
+
+
+def test_columnar_matches_batch(tmp_path):
+    pytest.importorskip("numpy")
+    from oracle.columnar import ColumnarOracleAnalyzer
+
+    history = make_history()
+    storage = OracleStorage(tmp_path / "oracle.db")
+    storage.save_many(history)
+
+    batch = OracleAnalyzer(storage.load()).analyze()
+    columnar = ColumnarOracleAnalyzer(storage.db_path).analyze()
+
+    assert batch
+    assert [(i.type, i.source, i.description) for i in columnar] == [
+        (i.type, i.source, i.description) for i in batch
+    ]
+    for got, expected in zip(columnar, batch):
+        assert got.confidence == pytest.approx(expected.confidence)
+        assert got.metadata == pytest.approx(expected.metadata)
@@ -0,0 +1,329 @@
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from oracle.metrics import OracleMetrics
+from oracle.models import ActionResult, OracleRecord
+from oracle.service import OracleService
+from oracle.storage import OracleStorage
+
+
+def make_record(i: int = 0, **overrides) -> OracleRecord:
+    values = dict(
+        ts=datetime.now(),
+        event_type="text",
+        source="terminal",
+        action_type="send_message",
+        target="sala",
+        confidence=0.5,
+        priority=1,
+        result=ActionResult.SUCCESS,
+    )
+    values.update(overrides)
+    return OracleRecord(**values)
+
+
+def stored(path: Path) -> int:
+    # conexão separada: load() faria o flush na thread do teste
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+
+
+def wait_stored(path: Path, count: int, deadline: float = 2.0) -> int:
+    until = time.monotonic() + deadline
+    while stored(path) != count and time.monotonic() < until:
+        time.sleep(0.01)
+    return stored(path)
+
+
+def test_write_behind_flushes_by_batch_size(tmp_path):
+    path = tmp_path / "oracle.db"
+    # flush_interval longo: só o tamanho do lote acorda a thread de escrita
+    storage = OracleStorage(path, write_behind=True, batch_size=10, flush_interval=60)
+
+    for i in range(9):
+        storage.save(make_record(i))
+    time.sleep(0.05)
+    assert stored(path) == 0
+
+    storage.save(make_record(9))
+    assert wait_stored(path, 10) == 10
+
+    storage.close()
+
+
+def test_close_persists_pending_records(tmp_path):
+    path = tmp_path / "oracle.db"
+    storage = OracleStorage(path, write_behind=True, flush_interval=60)
+
+    storage.save_many([make_record(i) for i in range(5)])
+    storage.close()
+
+    assert len(OracleStorage(path).load()) == 5
+
+
+def test_writer_survives_write_errors_and_save_after_close(tmp_path):
+    path = tmp_path / "oracle.db"
+    storage = OracleStorage(path, write_behind=True, batch_size=1, flush_interval=0.01)
+
+    write, failures = storage._write, []
+
+    def flaky(recs):
+        if recs and not failures:
+            failures.append(len(recs))
+            raise sqlite3.OperationalError("database is locked")
+        write(recs)
+
+    storage._write = flaky
+    storage.save(make_record(0))
+
+    assert wait_stored(path, 1) == 1
+    assert failures == [1]
+    assert storage.write_errors == 1
+    assert storage._writer.is_alive()
+
+    storage.close()
+    storage.save(make_record(1))  # depois do close grava direto
+    assert len(OracleStorage(path).load()) == 2
+
+
+def test_load_range_filters_window_and_columns(tmp_path):
+    storage = OracleStorage(tmp_path / "oracle.db")
+    base = datetime(2026, 1, 10, 12, 0)
+
+    for minute in range(10):
+        storage.save(make_record(ts=base.replace(minute=minute), target=f"t{minute}"))
+
+    window = storage.load_range(
+        since=base.replace(minute=3),
+        until=base.replace(minute=6),
+        columns=("ts", "target"),
+    )
+
+    assert [r.target for r in window] == ["t3", "t4", "t5"]
+    assert all(r.source is None and r.result is None for r in window)
+
+
+def test_partitions_have_indexes(tmp_path):
+    storage = OracleStorage(tmp_path / "oracle.db")
+    storage.save(make_record(ts=datetime(2026, 1, 10, 12, 0)))
+
+    with storage._connection() as conn:
+        names = {
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+
+    assert {
+        "idx_observations_20260110_ts",
+        "idx_observations_20260110_source_action",
+        "idx_observations_20260110_action_target",
+        "idx_observations_20260110_result",
+    } <= names
+
+
+def _open_repeatedly(path: Path):
+    for _ in range(30):
+        OracleStorage(path).close()
+
+
+def test_concurrent_opens_keep_the_view(tmp_path):
+    import multiprocessing
+
+    path = tmp_path / "oracle.db"
+    storage = OracleStorage(path)
+    storage.save(make_record())
+
+    def schema_version():
+        with sqlite3.connect(path) as conn:
+            return conn.execute("PRAGMA schema_version").fetchone()[0]
+
+    # reabrir sem partição nova não reescreve a view
+    before = schema_version()
+    OracleStorage(path).close()
+    assert schema_version() == before
+
+    # vários processos abrindo o mesmo banco não disputam o DROP/CREATE
+    with multiprocessing.get_context("fork").Pool(6) as pool:
+        pool.map(_open_repeatedly, [path] * 6)
+
+    assert len(storage.load()) == 1
+    storage.close()
+
+
+def test_retention_keeps_hourly_rollups(tmp_path):
+    storage = OracleStorage(tmp_path / "oracle.db")
+    now = datetime.now()
+    old = now - timedelta(days=30)
+
+    storage.save_many(
+        [
+            make_record(ts=old, confidence=0.1, result=ActionResult.FAILED),
+            make_record(ts=old, confidence=0.2, result=ActionResult.FAILED),
+            make_record(ts=old, action_type="log", confidence=0.9),
+            make_record(ts=now, confidence=0.3),
+        ]
+    )
+    service = OracleService(storage=storage)
+    before = (OracleMetrics(storage.db_path).snapshot(), service.analyze())
+
+    storage.retention_days = 7
+    assert storage.apply_retention() == 1
+    assert [r.ts for r in storage.load()] == [
+        datetime.fromtimestamp(int(now.timestamp() * 1000) / 1000)
+    ]
+    assert sum(r.count for r in storage.load_rollups()) == 3
+
+    after = (OracleMetrics(storage.db_path).snapshot(), service.analyze())
+    assert after[0]["actions_count"] == before[0]["actions_count"]
+    assert after[0]["success_rate"] == pytest.approx(before[0]["success_rate"])
+    assert after[0]["average_confidence"] == pytest.approx(
+        before[0]["average_confidence"]
+    )
+    assert [i.description for i in after[1]] == [i.description for i in before[1]]
+
+    # o modo columnar também precisa somar as horas consolidadas
+    pytest.importorskip("numpy")
+    columnar = OracleService(storage=storage, analyzer_mode="columnar").analyze()
+    assert [i.description for i in columnar] == [i.description for i in before[1]]
+
+
+def test_legacy_table_is_migrated(tmp_path):
+    path = tmp_path / "oracle.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE observations (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "ts TEXT, event_type TEXT, source TEXT, action_type TEXT, "
+            "target TEXT, confidence REAL, priority INTEGER, result TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO observations (ts, event_type, source, action_type, "
+            "target, confidence, priority, result) "
+            "VALUES ('2026-01-09T13:01:33.016000', 'text', 'terminal', "
+            "'send_message', 'sala', 0.9, 0, 'IGNORED')"
+        )
+
+    [record] = OracleStorage(path).load()
+    assert record.ts == datetime(2026, 1, 9, 13, 1, 33, 16000)
+    assert record.result == ActionResult.IGNORED
+
+
+def test_migrated_legacy_results_agree_across_modes(tmp_path):
+    path = tmp_path / "oracle.db"
+    # todos na mesma hora: a média de horário não depende da ordem da soma
+    base = datetime.now().replace(minute=0, second=0, microsecond=0)
+    base -= timedelta(hours=1)
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE observations (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "ts TEXT, event_type TEXT, source TEXT, action_type TEXT, "
+            "target TEXT, confidence REAL, priority INTEGER, result TEXT)"
+        )
+        conn.executemany(
+            "INSERT INTO observations (ts, event_type, source, action_type, "
+            "target, confidence, priority, result) "
+            "VALUES (?, 'text', 'terminal', 'send_message', 'sala', 0.9, 0, ?)",
+            [
+                ((base + timedelta(minutes=i)).isoformat(), result)
+                for i, result in enumerate(
+                    ["IGNORED", "BLOCKED", "IGNORED", "failed", "success"]
+                )
+            ],
+        )
+
+    storage = OracleStorage(path)
+    with sqlite3.connect(path) as conn:
+        stored = {row[0] for row in conn.execute("SELECT result FROM observations")}
+    assert stored == {"ignored", "failed", "success"}
+
+    batch = OracleService(storage=storage, analyzer_mode="batch").analyze()
+    sql = OracleService(storage=storage, analyzer_mode="sql").analyze()
+    assert [(i.description, i.metadata) for i in sql] == [
+        (i.description, i.metadata) for i in batch
+    ]
+    assert {"blocked": 4, "total": 5} in [i.metadata for i in sql]
+    assert OracleMetrics(path).snapshot()["success_rate"] == pytest.approx(0.2)
+
+
+def test_metrics_snapshot_matches_individual_queries(tmp_path):
+    storage = OracleStorage(tmp_path / "oracle.db")
+    storage.save_many(
+        [
+            make_record(confidence=0.2, result=ActionResult.SUCCESS),
+            make_record(confidence=0.4, result=ActionResult.FAILED),
+            make_record(action_type="log", confidence=0.9, result=ActionResult.SUCCESS),
+        ]
+    )
+
+    metrics = OracleMetrics(storage.db_path)
+    snapshot = metrics.snapshot()
+
+    assert snapshot["success_rate"] == pytest.approx(metrics.success_rate())
+    assert snapshot["average_confidence"] == pytest.approx(metrics.average_confidence())
+    assert snapshot["actions_count"] == metrics.actions_count()
+
+
+def test_metrics_snapshot_cache_and_invalidate(tmp_path):
+    storage = OracleStorage(tmp_path / "oracle.db")
+    metrics = OracleMetrics(storage.db_path, ttl=60)
+
+    assert metrics.snapshot()["actions_count"] == {}
+
+    storage.save(make_record())
+    assert metrics.snapshot()["actions_count"] == {}
+
+    metrics.invalidate()
+    assert metrics.snapshot()["actions_count"] == {"send_message": 1}
+
+
+def test_metadata_roundtrip_and_policy_column(tmp_path):
+    storage = OracleStorage(tmp_path / "oracle.db")
+    storage.save_many(
+        [
+            make_record(metadata={"policy": "food_policy", "vetoed": True, "n": 3}),
+            make_record(metadata={"reason": "no_action"}),
+            make_record(),
+        ]
+    )
+
+    assert [r.metadata for r in storage.load()] == [
+        {"policy": "food_policy", "vetoed": True, "n": 3},
+        {"reason": "no_action"},
+        {},
+    ]
+    assert [r.metadata for r in storage.iter_range(columns=("ts", "policy"))] == [
+        {"policy": "food_policy"},
+        {},
+        {},
+    ]
+
+    with storage._connection() as conn:
+        plan = " ".join(
+            row[-1]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM observations "
+                "WHERE policy = 'food_policy'"
+            )
+        )
+    assert "idx_observations_" in plan and "_policy" in plan
+
+
+def test_codec_int_bounds_and_text_fallback():
+    from oracle import codec
+
+    limits = [-(2**63), -(2**31) - 1, -33, -32, 0x7F, 0xFF, 2**32, 2**64 - 1]
+    assert codec.decode(codec.encode(limits)) == limits
+
+    # fora de 64 bits o inteiro é gravado como texto, como outros tipos
+    assert codec.decode(codec.encode({"big": 2**64, "small": -(2**63) - 1})) == {
+        "big": str(2**64),
+        "small": str(-(2**63) - 1),
+    }
@@ -1,10 +1,15 @@
+import asyncio
 import sys
+import threading
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 from agents.dominus import DominusAgent
 from agents.lucia import LuciaAgent
+from cortex.contracts import Action, ActionType
+from oracle.models import ActionResult
 from runtime.adapters.terminal import TerminalAdapter
+from runtime.container import Container
 from runtime.context import NexusContext
 from runtime.runtime import NexusRuntime
 
@@ -30,3 +35,294 @@ def test_terminal_flow():
 
 
 test_terminal_flow()
+
+
+class AsyncEchoAgent:
+    name = "lucia"
+
+    async def think(self, convo, session):
+        return Action(
+            type=ActionType.SEND_MESSAGE,
+            target=convo.stream,
+            payload={"text": convo.content},
+            confidence=0.9,
+        )
+
+
+def test_async_flow_defers_side_effects():
+    ctx = NexusContext()
+    ctx.register_agent("lucia", AsyncEchoAgent())
+
+    runtime = NexusRuntime(ctx)
+
+    async def run():
+        result = await runtime.ahandle_input(
+            text="bolo de cenoura",
+            user_id="user-async",
+            stream="terminal",
+        )
+        await runtime.background.drain()
+        return result
+
+    result = asyncio.run(run())
+
+    assert result["agent"] == "lucia"
+    assert result["action"]["payload"]["text"] == "bolo de cenoura"
+    assert runtime.memory.recall("terminal", user_id="user-async") == [
+        "bolo de cenoura"
+    ]
+
+
+def test_batch_flow_keeps_order_and_observes_once():
+    ctx = NexusContext(Container())
+    ctx.register_agent("lucia", LuciaAgent())
+
+    runtime = NexusRuntime(ctx)
+
+    batches = []
+    runtime.oracle.observe_many = batches.append
+
+    inputs = [
+        {"text": "oi", "user_id": "a", "stream": "terminal"},
+        {"text": "quero bolo", "user_id": "b", "stream": "terminal"},
+        {"text": "oi", "user_id": "c", "stream": "terminal"},
+        # barrado pelo cooldown do Guard, mas ainda observado
+        {"text": "bolo de fubá", "user_id": "a", "stream": "terminal"},
+    ]
+    results = runtime.handle_batch(inputs)
+
+    assert [r["agent"] for r in results] == ["lucia"] * 4
+    assert results[0]["action"] is None
+    assert results[1]["action"]["payload"]["text"].startswith("Que delícia")
+
+    # uma única chamada, com as observações na ordem das entradas
+    assert len(batches) == 1
+    assert [o["event"].payload["text"] for o in batches[0]] == [
+        "quero bolo",
+        "bolo de fubá",
+    ]
+    assert [o["result"] for o in batches[0]] == [
+        ActionResult.SUCCESS,
+        ActionResult.IGNORED,
+    ]
+
+
+def test_context_and_runtime_share_one_container():
+    services = Container()
+    ctx = NexusContext(services)
+    ctx.register_agent("lucia", LuciaAgent())
+    runtime = NexusRuntime(ctx)
+
+    assert runtime.sessions is ctx.session_manager is services.sessions
+    assert runtime.memory is ctx.memory
+    assert runtime.oracle is ctx.oracle
+
+    lookups = []
+    get_session = services.sessions.get_session
+    services.sessions.get_session = lambda *args: lookups.append(args) or get_session(
+        *args
+    )
+
+    runtime.handle_input(text="oi", user_id="user-c", stream="terminal")
+    runtime.handle_input(text="oi de novo", user_id="user-c", stream="terminal")
+
+    # uma consulta por evento; a segunda reencontra a sessão aberta
+    assert lookups == [("user-c", "terminal"), ("user-c", "terminal")]
+    assert services.sessions.stats()["active"] == 1
+
+
+def _write_behind_oracle(path):
+    from oracle.service import OracleService
+    from oracle.storage import OracleStorage
+
+    return OracleService(OracleStorage(path / "oracle.db", write_behind=True))
+
+
+def test_async_event_and_http_post_persist_observations(tmp_path, monkeypatch):
+    import httpx
+
+    from cortex.contracts import Event, EventType
+    from cortex.core import ahandle_event
+    from cortex.state import GlobalState
+    from runtime.container import container
+    from stream.http.app import create_app
+
+    services = container()
+    oracle = _write_behind_oracle(tmp_path)
+    monkeypatch.setattr(services, "oracle", oracle)
+    # estado novo: o cooldown do Guard não bloqueia (nem deixa de observar)
+    monkeypatch.setattr(services, "global_state", GlobalState())
+
+    # memória e Oracle rodam fora da thread do loop
+    threads = []
+    remember = services.memory.remember
+    monkeypatch.setattr(
+        services.memory,
+        "remember",
+        lambda *args: threads.append(threading.current_thread()) or remember(*args),
+    )
+
+    event = Event(
+        type=EventType.TEXT,
+        source="terminal",
+        payload={"text": "quero bolo", "user_id": "async-core"},
+    )
+
+    async def run():
+        await ahandle_event(event)
+        services.global_state.last_action_time = None
+
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://nexus"
+        ) as client:
+            response = await client.post(
+                "/event",
+                json={
+                    "type": "text",
+                    "source": "http",
+                    "payload": {"text": "quero bolo", "user_id": "async-http"},
+                },
+            )
+        return response
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+    # nada de tarefas por evento: a observação está na fila do write-behind
+    assert services.background.pending() == 0
+    oracle.storage.flush()
+
+    records = oracle.storage.load()
+    assert [r.source for r in records] == ["terminal", "http"]
+    assert all(r.metadata["policy"] == "food_policy" for r in records)
+    oracle.close()
+
+
+def test_background_tasks_apply_backpressure():
+    from cortex.tasks import BackgroundTasks
+
+    background = BackgroundTasks(max_in_flight=2)
+    done = []
+
+    async def run():
+        tasks = [background.spawn(done.append, i) for i in range(5)]
+        # acima do limite a função roda na hora, no próprio loop
+        assert done == [2, 3, 4]
+        await background.drain()
+        return tasks
+
+    tasks = asyncio.run(run())
+
+    assert sorted(done) == [0, 1, 2, 3, 4]
+    assert [t is None for t in tasks] == [False, False, True, True, True]
+    assert background.saturated == 3
+
+
+def _counting_oracle(path):
+    from oracle.service import OracleService
+    from oracle.storage import OracleStorage
+
+    storage = OracleStorage(path / "oracle.db")
+    calls = []
+    save_many = storage.save_many
+    storage.save_many = lambda recs: calls.append(len(recs)) or save_many(recs)
+    return OracleService(storage), calls
+
+
+def _batch_events():
+    from cortex.contracts import Event, EventType
+
+    # duas conversas vetadas e a comida executada por último (depois dela
+    # o cooldown do Guard barraria sem observar)
+    texts = ["oi", "tudo bem?", "quero bolo de cenoura"]
+    return [
+        Event(
+            type=EventType.TEXT,
+            source=f"s{i}",
+            payload={"text": text, "user_id": f"batch{i}"},
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_core_batches_keep_order_in_one_transaction(tmp_path, monkeypatch):
+    from cortex.core import ahandle_events, handle_events
+    from cortex.state import GlobalState
+    from runtime.container import container
+
+    services = container()
+    oracle, calls = _counting_oracle(tmp_path)
+    monkeypatch.setattr(services, "oracle", oracle)
+
+    for handle in (handle_events, lambda events: asyncio.run(ahandle_events(events))):
+        monkeypatch.setattr(services, "global_state", GlobalState())
+        actions = handle(_batch_events())
+
+        assert [a.type for a in actions] == [
+            ActionType.LOG,
+            ActionType.LOG,
+            ActionType.SEND_MESSAGE,
+        ]
+        assert actions[0].payload == actions[1].payload == {"vetoed": True}
+        assert actions[2].target == "s2"
+
+    assert calls == [3, 3]
+    assert [r.source for r in oracle.storage.load()] == ["s0", "s1", "s2"] * 2
+    oracle.close()
+
+
+def test_http_batch_route_keeps_order_and_limits_size(tmp_path, monkeypatch):
+    import httpx
+
+    from cortex.state import GlobalState
+    from runtime.container import container
+    from stream.http import routes
+    from stream.http.app import create_app
+
+    services = container()
+    oracle, calls = _counting_oracle(tmp_path)
+    monkeypatch.setattr(services, "oracle", oracle)
+    monkeypatch.setattr(services, "global_state", GlobalState())
+    monkeypatch.setattr(routes, "MAX_BATCH_EVENTS", 3)
+
+    # o lote é processado no threadpool, não na thread do loop
+    threads = []
+    observe_many = oracle.observe_many
+    monkeypatch.setattr(
+        oracle,
+        "observe_many",
+        lambda obs: threads.append(threading.current_thread()) or observe_many(obs),
+    )
+
+    events = [event.model_dump(exclude_none=True) for event in _batch_events()]
+
+    async def run():
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://nexus"
+        ) as client:
+            ok = await client.post("/events/batch", json=events)
+            too_big = await client.post("/events/batch", json=events + events[:1])
+        return ok, too_big
+
+    ok, too_big = asyncio.run(run())
+
+    assert ok.status_code == 200
+    body = ok.json()
+    assert len({item["event_id"] for item in body}) == 3
+    assert [item["action"]["type"] for item in body] == [
+        "log",
+        "log",
+        "send_message",
+    ]
+    assert body[2]["action"]["target"] == "s2"
+
+    # o lote acima do limite é recusado antes de tocar o pipeline
+    assert too_big.status_code == 413
+    assert calls == [3]
+    assert threads and threading.main_thread() not in threads
+    assert [r.source for r in oracle.storage.load()] == ["s0", "s1", "s2"]
+    oracle.close()
@@ -0,0 +1,87 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from cortex.session_store import SqliteSessionBackend
+from cortex.state import SessionManager
+
+
+def test_reap_removes_users_that_never_return():
+    manager = SessionManager()
+
+    for i in range(5):
+        manager.start_session(f"user{i}", "terminal", "lucia")
+
+    for session in list(manager.backend.sessions.values())[:3]:
+        session.last_activity = time.time() - manager.TIMEOUT_SECONDS - 1
+
+    assert manager.reap() == 3
+    assert manager.stats() == {"active": 2, "expired": 3, "evicted": 0}
+
+
+def test_max_sessions_evicts_least_recently_active():
+    manager = SessionManager(max_sessions=2)
+
+    first = manager.start_session("a", "terminal", "lucia")
+    manager.start_session("b", "terminal", "lucia")
+    manager.update_activity(first)
+    manager.start_session("c", "terminal", "lucia")
+
+    assert manager.get_session("a", "terminal") is first
+    assert manager.get_session("b", "terminal") is None
+    assert manager.stats()["evicted"] == 1
+
+
+def test_background_reaper():
+    manager = SessionManager()
+    session = manager.start_session("a", "terminal", "lucia")
+    session.last_activity = 0
+
+    manager.start_reaper(interval=0.01)
+    try:
+        deadline = time.time() + 2
+        while manager.backend.sessions and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        manager.stop_reaper()
+
+    assert not manager.backend.sessions
+
+
+def test_sqlite_backend_is_shared_between_managers(tmp_path):
+    db = tmp_path / "sessions.db"
+    first = SessionManager(backend=SqliteSessionBackend(db, flush_interval=60))
+    second = SessionManager(backend=SqliteSessionBackend(db, flush_interval=60))
+
+    try:
+        session = first.start_session("a", "terminal", "lucia")
+        session.context["mood"] = "feliz"
+        first.update_activity(session)
+
+        # a corrida de abertura fica com a sessão viva do outro processo
+        adopted = second.start_session("a", "terminal", "lucia")
+        assert adopted.session_id == session.session_id
+
+        first.backend.flush()
+        loaded = second.get_session("a", "terminal")
+        assert loaded.context == {"mood": "feliz"}
+        assert loaded.last_activity == session.last_activity
+
+        second.close(loaded)
+        assert first.get_session("a", "terminal") is None
+        assert first.stats()["active"] == 0
+    finally:
+        first.backend.close()
+        second.backend.close()
+
+
+def test_sessions_are_slotted_with_lazy_ids():
+    manager = SessionManager()
+    first = manager.start_session("a", "terminal", "lucia")
+    second = manager.start_session("b", "terminal", "lucia")
+
+    assert not hasattr(first, "__dict__")
+    assert first._session_id is None and first._context is None
+    assert first.session_id == first.session_id != second.session_id
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from benchmarks.startup import ENTRY_POINTS, OWN_BUDGET_MS, measure
+
+
+@pytest.mark.parametrize("entry", sorted(ENTRY_POINTS))
+def test_entry_point_import_is_quiet_and_within_budget(entry):
+    if entry == "http":
+        pytest.importorskip("fastapi")
+
+    startup = measure(ENTRY_POINTS[entry])
+
+    # nada de saída nem de oracle.db/memory.db criados só por importar
+    assert startup.output == ""
+    assert startup.created == []
+    assert startup.own_ms <= OWN_BUDGET_MS, startup.slowest
+
+
+def test_main_import_does_not_load_the_oracle():
+    heavy = ("oracle.analyzer", "oracle.storage", "sqlite3")
+    code = f"import sys, main; print(sorted(set({heavy}) & set(sys.modules)))"
+    done = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # o Oracle só é aberto pelo container, no primeiro uso
+    assert done.stdout.strip() == "[]"
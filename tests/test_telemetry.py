@@ -0,0 +1,162 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from agents.lucia import LuciaAgent
+from runtime.container import Container
+from runtime.context import NexusContext
+from runtime.runtime import NexusRuntime
+from telemetry import log
+from telemetry.metrics import NO_LAPS, LatencyHistogram, StageMetrics
+
+
+@pytest.fixture
+def captured():
+    buffer = io.StringIO()
+    yield buffer
+    log.configure(level="INFO", levels={}, sink=sys.stderr)
+
+
+def test_component_levels_gate_before_formatting(captured):
+    log.configure(level="WARNING", levels={"oracle": "DEBUG"}, sink=captured)
+
+    observer = log.get_logger("oracle.observer")
+    core = log.get_logger("cortex.core")
+
+    assert observer.enabled("DEBUG")
+    assert not core.enabled("INFO")
+
+    core.info("descartado", payload=object())
+    observer.debug("observação {sem template}", result="success", confidence=0.9)
+    core.warning("aviso")
+    log.flush()
+
+    lines = [json.loads(line) for line in captured.getvalue().splitlines()]
+    assert [(l["component"], l["level"], l["message"]) for l in lines] == [
+        ("oracle.observer", "DEBUG", "observação {sem template}"),
+        ("cortex.core", "WARNING", "aviso"),
+    ]
+    assert lines[0]["result"] == "success"
+    assert lines[0]["confidence"] == 0.9
+
+
+def test_parse_levels_from_env_spec():
+    assert log.parse_levels("oracle=warning, cortex.core=DEBUG,") == {
+        "oracle": "WARNING",
+        "cortex.core": "DEBUG",
+    }
+    with pytest.raises(ValueError):
+        log.configure(level="VERBOSE")
+
+
+def test_histogram_has_fixed_buckets_and_exact_octave_counts():
+    histogram = LatencyHistogram()
+    size = len(histogram.counts)
+
+    for ns in (1_500, 20_000, 20_000, 3_000_000, 10**12):
+        histogram.record(ns)
+
+    assert len(histogram.counts) == size
+    assert histogram.count == 5
+    assert 20e-6 <= histogram.quantile(0.5) <= 20e-6 * 1.125
+
+    cumulative = dict(histogram.cumulative())
+    assert cumulative[8e-06] == 1
+    assert cumulative[3.2e-05] == 3
+    assert cumulative[0.004096] == 4
+
+
+def test_runtime_stages_are_labelled_and_exported():
+    services = Container()
+    services.metrics = StageMetrics()
+    ctx = NexusContext(services)
+    ctx.register_agent("lucia", LuciaAgent())
+    runtime = NexusRuntime(ctx)
+    runtime.oracle.observe = lambda *args, **kwargs: None
+
+    runtime.handle_input(text="quero bolo", user_id="m1", stream="terminal")
+
+    stages = {key[1] for key in services.metrics.histograms}
+    assert {"route", "think", "veto", "guard", "echo", "oracle", "memory"} <= stages
+    assert {key[2:] for key in services.metrics.histograms} == {
+        ("lucia", "send_message")
+    }
+
+    text = services.metrics.render()
+    assert "# TYPE nexus_stage_latency_seconds histogram" in text
+    assert (
+        'nexus_stage_latency_seconds_count{pipeline="runtime",stage="guard",'
+        'agent="lucia",action="send_message"} 1'
+    ) in text
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = StageMetrics(enabled=False)
+
+    laps = metrics.start("core")
+    laps.mark("guard")
+    laps.finish("lucia", "send_message")
+
+    assert laps is NO_LAPS
+    assert metrics.histograms == {}
+
+
+def _get_metrics():
+    import asyncio
+
+    import httpx
+
+    from stream.http.app import create_app
+
+    async def run():
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://nexus"
+        ) as client:
+            return await client.get("/metrics")
+
+    return asyncio.run(run())
+
+
+def test_metrics_route_serves_prometheus_text(monkeypatch):
+    from runtime.container import container
+
+    metrics = StageMetrics()
+    laps = metrics.start("core")
+    laps.mark("guard")
+    laps.finish("food_policy", "send_message")
+    monkeypatch.setattr(container(), "metrics", metrics)
+
+    response = _get_metrics()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == (
+        "text/plain; version=0.0.4; charset=utf-8"
+    )
+
+    lines = response.text.splitlines()
+    assert lines[:2] == [
+        "# HELP nexus_stage_latency_seconds Latência de cada estágio do pipeline.",
+        "# TYPE nexus_stage_latency_seconds histogram",
+    ]
+    labels = 'pipeline="core",stage="guard",agent="food_policy",action="send_message"'
+    assert f'nexus_stage_latency_seconds_bucket{{{labels},le="+Inf"}} 1' in lines
+    assert f"nexus_stage_latency_seconds_count{{{labels}}} 1" in lines
+    assert any(
+        line.startswith(f"nexus_stage_latency_seconds_sum{{{labels}}} ")
+        for line in lines
+    )
+
+
+def test_metrics_route_is_404_when_disabled(monkeypatch):
+    from runtime.container import container
+    from telemetry.metrics import default_stage_metrics
+
+    monkeypatch.setenv("NEXUS_METRICS", "0")
+    monkeypatch.setattr(container(), "metrics", default_stage_metrics())
+
+    assert _get_metrics().status_code == 404
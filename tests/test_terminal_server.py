@@ -0,0 +1,70 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from stream.terminal.server import TerminalStreamServer
+
+
+async def open_server(**kwargs):
+    terminal = TerminalStreamServer(port=0, **kwargs)
+    server = await terminal.start()
+    port = server.sockets[0].getsockname()[1]
+    return terminal, server, port
+
+
+def test_pipelined_lines_get_one_reply_each():
+    async def run():
+        terminal, server, port = await open_server()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"lucia oi\n\ndominus ligar\nlucia tchau\n")
+            await writer.drain()
+
+            replies = [await reader.readline() for _ in range(3)]
+            writer.close()
+            await writer.wait_closed()
+            await asyncio.sleep(0.05)  # o handler vê o EOF e encerra
+            return replies, terminal.connections
+        finally:
+            server.close()
+            await server.wait_closed()
+            terminal.sessions.stop_reaper()
+
+    replies, connections = asyncio.run(run())
+
+    # a sessão do usuário fixa o agente escolhido na primeira mensagem
+    assert replies == [
+        b"[LUCIA] lucia oi\n",
+        b"[LUCIA] dominus ligar\n",
+        b"[LUCIA] lucia tchau\n",
+    ]
+    assert connections == 0
+
+
+def test_connection_cap_and_idle_timeout():
+    async def run():
+        terminal, server, port = await open_server(max_connections=1, idle_timeout=0.2)
+        try:
+            first_reader, first_writer = await asyncio.open_connection(
+                "127.0.0.1", port
+            )
+            await asyncio.sleep(0.05)
+
+            second_reader, _ = await asyncio.open_connection("127.0.0.1", port)
+            rejected = await second_reader.readline()
+
+            # ocioso além do timeout: o servidor encerra a conexão
+            closed = await asyncio.wait_for(first_reader.read(), timeout=2)
+            first_writer.close()
+            return rejected, closed, terminal.connections
+        finally:
+            server.close()
+            await server.wait_closed()
+            terminal.sessions.stop_reaper()
+
+    rejected, closed, connections = asyncio.run(run())
+    assert rejected.startswith(b"servidor cheio")
+    assert closed == b""
+    assert connections == 0